@@ -0,0 +1,70 @@
+"""Load test of serving Fastfood features to many concurrent clients.
+
+Every client sends requests of 1 to 4 rows, one after the other.  The
+requests are served either by one transform call per request on a thread
+pool, or by a BatchingTransformer which groups them into batches.
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from sklearn_extra.kernel_approximation import Fastfood
+from sklearn_extra.serving import BatchingTransformer
+
+n_clients = 200
+n_requests_per_client = 50
+n_features = 256
+n_workers = 2
+
+rng = np.random.RandomState(0)
+fastfood = Fastfood(n_components=2048, random_state=42).fit_from_n_features(
+    n_features)
+requests = [[rng.random_sample(size=(rng.randint(1, 5), n_features))
+             for _ in range(n_requests_per_client)]
+            for _ in range(n_clients)]
+
+
+async def client(transform, client_requests, latencies):
+    for request in client_requests:
+        start = time.perf_counter()
+        await transform(request)
+        latencies.append(time.perf_counter() - start)
+
+
+async def load_test(transform):
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*[client(transform, client_requests, latencies)
+                           for client_requests in requests])
+    duration = time.perf_counter() - start
+    n_rows = sum(request.shape[0] for client_requests in requests
+                 for request in client_requests)
+    return n_rows / duration, np.percentile(latencies, [50, 99]) * 1000
+
+
+def report(name, loop, transform):
+    throughput, (p50, p99) = loop.run_until_complete(load_test(transform))
+    print("%-28s %10.0f rows/s   p50 %7.2f ms   p99 %7.2f ms"
+          % (name, throughput, p50, p99))
+
+
+loop = asyncio.new_event_loop()
+
+executor = ThreadPoolExecutor(max_workers=n_workers)
+
+
+async def unbatched_transform(X):
+    return await loop.run_in_executor(executor, fastfood.transform, X)
+
+
+report("one transform per request", loop, unbatched_transform)
+executor.shutdown()
+
+for max_batch_size in [32, 128, 512]:
+    with BatchingTransformer(fastfood, max_batch_size=max_batch_size,
+                             max_wait_ms=2., n_workers=n_workers) as batching:
+        report("batches of %d rows" % max_batch_size, loop,
+               batching.transform)
+loop.close()
@@ -0,0 +1,36 @@
+"""Reports the storage and accuracy of reduced precision Fastfood features.
+
+For every output_dtype, the features of the same Fastfood map are compared
+with the float64 features and with the exact RBF kernel.
+"""
+import numpy as np
+
+from sklearn.metrics.pairwise import rbf_kernel
+
+from sklearn_extra.kernel_approximation import Fastfood
+
+# generate data
+rng = np.random.RandomState(0)
+X = rng.random_sample(size=(1000, 256))
+X /= X.sum(axis=1)[:, np.newaxis]
+
+gamma = 10.
+sigma = np.sqrt(1 / (2 * gamma))
+kernel = rbf_kernel(X, gamma=gamma)
+
+print("%-8s %14s %14s %14s %14s" % ('dtype', 'bytes per row',
+                                    'max feat. err', 'kernel RMSE',
+                                    'kernel max err'))
+for output_dtype in ['float64', 'float32', 'float16', 'int16', 'int8']:
+    ff_transform = Fastfood(sigma=sigma, n_components=4096,
+                            output_dtype=output_dtype, random_state=42)
+    X_reduced = ff_transform.fit_transform(X)
+    X_trans = ff_transform.dequantize(X_reduced)
+    if output_dtype == 'float64':
+        X_reference = X_trans
+    kernel_error = np.dot(X_trans, X_trans.T) - kernel
+    print("%-8s %14d %14.2e %14.2e %14.2e"
+          % (output_dtype, X_reduced[0].nbytes,
+             np.abs(X_trans - X_reference).max(),
+             np.sqrt(np.mean(kernel_error ** 2)),
+             np.abs(kernel_error).max()))
@@ -0,0 +1,27 @@
+"""Measures the time to import sklearn_extra and its submodules.
+
+Every import is timed in a fresh interpreter, as short-lived workers would
+do, and the median over several runs is reported.
+"""
+import subprocess
+import sys
+
+import numpy as np
+
+statements = [
+    'import sklearn_extra',
+    'from sklearn_extra.kernel_approximation import Fastfood',
+    'from sklearn_extra.cluster import FastfoodKernelKMeans',
+    'from sklearn_extra.neighbors import FastfoodLSHIndex',
+    'from sklearn_extra.random_projection import '
+    'SubsampledRandomizedHadamardProjection',
+]
+n_runs = 7
+
+code = ('import time; start = time.perf_counter(); {}; '
+        'print(time.perf_counter() - start)')
+for statement in statements:
+    timings = [float(subprocess.check_output(
+                   [sys.executable, '-c', code.format(statement)]))
+               for _ in range(n_runs)]
+    print("Timing %s: \t%.1f ms" % (statement, 1000 * np.median(timings)))
@@ -0,0 +1,251 @@
+"""Accuracy versus throughput of Fastfood, RBFSampler and Nystroem.
+
+Sweeps the number of output features, the number of input features and the
+number of samples, on synthetic classification data or on a local dataset,
+and records for every method and configuration:
+
+- the transform throughput in rows per second (best of --repeats),
+- the peak memory allocated by transform, traced by tracemalloc,
+- the relative Frobenius error of the approximated RBF Gram matrix on a
+  subsample of the test set,
+- the test accuracy of a linear classifier trained on the features.
+
+The results are written as JSON and CSV.  If matplotlib is installed, the
+Pareto plots of error and accuracy versus throughput are saved as well, one
+per dataset, n_features and n_samples, with the Pareto optimal points
+circled.
+
+Local datasets are .npz files holding arrays X and y, or .npy/.csv files
+holding the target in the last column.  They are subsampled to n_samples
+rows, --n-features is ignored for them.
+
+Example::
+
+    python bench_kernel_approximation_pareto.py --n-components 256 1024 4096 \
+        --n-features 64 512 --n-samples 5000 --output results/pareto
+"""
+import argparse
+import csv
+import json
+import os
+import time
+import tracemalloc
+
+import numpy as np
+
+from sklearn.datasets import make_classification
+from sklearn.kernel_approximation import Nystroem, RBFSampler
+from sklearn.linear_model import RidgeClassifier
+from sklearn.metrics.pairwise import euclidean_distances, rbf_kernel
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from sklearn_extra.kernel_approximation import Fastfood
+
+METHODS = ['Fastfood', 'RBFSampler', 'Nystroem']
+FIELDS = ['dataset', 'n_samples', 'n_features', 'method', 'n_components',
+          'n_features_out', 'fit_time', 'throughput', 'peak_memory',
+          'gram_error', 'accuracy']
+
+
+def make_method(method, n_components, gamma, random_state):
+    """Approximation with about n_components output features."""
+    if method == 'Fastfood':
+        # the sin and cos features double the number of components
+        return Fastfood(sigma=np.sqrt(1 / (2 * gamma)),
+                        n_components=max(n_components // 2, 1),
+                        random_state=random_state)
+    elif method == 'RBFSampler':
+        return RBFSampler(gamma=gamma, n_components=n_components,
+                          random_state=random_state)
+    return Nystroem(gamma=gamma, n_components=n_components,
+                    random_state=random_state)
+
+
+def load_dataset(name, n_samples, n_features, random_state):
+    if name == 'synthetic':
+        X, y = make_classification(
+            n_samples=n_samples, n_features=n_features,
+            n_informative=min(n_features, 16), n_redundant=0,
+            n_clusters_per_class=4, random_state=random_state)
+    else:
+        if name.endswith('.npz'):
+            data = np.load(name)
+            X, y = data['X'], data['y']
+        else:
+            data = (np.load(name) if name.endswith('.npy')
+                    else np.loadtxt(name, delimiter=','))
+            X, y = data[:, :-1], data[:, -1]
+        rng = np.random.RandomState(random_state)
+        rows = rng.permutation(X.shape[0])[:n_samples]
+        X, y = X[rows], y[rows]
+    return StandardScaler().fit_transform(X.astype(np.float64)), y
+
+
+def median_gamma(X, random_state):
+    """ Bandwidth of the median heuristic """
+    rng = np.random.RandomState(random_state)
+    rows = rng.permutation(X.shape[0])[:1000]
+    distances = euclidean_distances(X[rows], squared=True)
+    return 1. / np.median(distances[np.triu_indices_from(distances, 1)])
+
+
+def best_time(function, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run(dataset, n_samples, n_features, n_components, args):
+    X, y = load_dataset(dataset, n_samples, n_features, args.random_state)
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.25, random_state=args.random_state)
+    gamma = (args.gamma if args.gamma is not None
+             else median_gamma(X_train, args.random_state))
+    X_gram = X_test[:args.n_gram]
+    kernel = rbf_kernel(X_gram, gamma=gamma)
+
+    for method in args.methods:
+        if method == 'Nystroem' and n_components > X_train.shape[0]:
+            continue
+        estimator = make_method(method, n_components, gamma,
+                                args.random_state)
+        fit_time = best_time(lambda: estimator.fit(X_train), 1)
+        duration = best_time(lambda: estimator.transform(X_test),
+                             args.repeats)
+        tracemalloc.start()
+        X_test_new = estimator.transform(X_test)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        features = estimator.transform(X_gram)
+        gram_error = (np.linalg.norm(np.dot(features, features.T) - kernel) /
+                      np.linalg.norm(kernel))
+        classifier = RidgeClassifier(alpha=1.).fit(
+            estimator.transform(X_train), y_train)
+        yield {
+            'dataset': os.path.basename(dataset),
+            'n_samples': X.shape[0],
+            'n_features': X.shape[1],
+            'method': method,
+            'n_components': n_components,
+            'n_features_out': X_test_new.shape[1],
+            'fit_time': fit_time,
+            'throughput': X_test.shape[0] / duration,
+            'peak_memory': peak_memory,
+            'gram_error': gram_error,
+            'accuracy': classifier.score(X_test_new, y_test),
+        }
+
+
+def pareto_optimal(points):
+    """ Mask of the points with no other point at least as fast and good """
+    points = np.asarray(points)
+    dominated = [np.any(np.all(points >= point, axis=1) &
+                        np.any(points > point, axis=1))
+                 for point in points]
+    return ~np.array(dominated, dtype=bool)
+
+
+def plot(results, prefix):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    configurations = sorted({(result['dataset'], result['n_features'],
+                              result['n_samples']) for result in results})
+    for dataset, n_features, n_samples in configurations:
+        rows = [result for result in results
+                if (result['dataset'], result['n_features'],
+                    result['n_samples']) == (dataset, n_features, n_samples)]
+        fig, axes = plt.subplots(1, 2, figsize=(11, 4.5))
+        for ax, metric, sign in [(axes[0], 'gram_error', -1),
+                                 (axes[1], 'accuracy', 1)]:
+            optimal = pareto_optimal([(row['throughput'], sign * row[metric])
+                                      for row in rows])
+            for method in METHODS:
+                points = sorted((row['n_components'], row['throughput'],
+                                 row[metric]) for row in rows
+                                if row['method'] == method)
+                if points:
+                    ax.plot([p[1] for p in points], [p[2] for p in points],
+                            'o-', label=method)
+            ax.scatter([row['throughput'] for row, o in zip(rows, optimal)
+                        if o],
+                       [row[metric] for row, o in zip(rows, optimal) if o],
+                       s=160, facecolors='none', edgecolors='k',
+                       label='Pareto optimal')
+            ax.set_xscale('log')
+            ax.set_xlabel('transform throughput (rows/s)')
+            ax.set_ylabel(metric.replace('_', ' '))
+            if metric == 'gram_error':
+                ax.set_yscale('log')
+        axes[0].legend()
+        fig.suptitle('%s, n_features=%d, n_samples=%d'
+                     % (dataset, n_features, n_samples))
+        fig.tight_layout()
+        fig.savefig('%s_%s_%d_%d.png' % (prefix, dataset, n_features,
+                                         n_samples))
+        plt.close(fig)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--datasets', nargs='+', default=['synthetic'],
+                        help="'synthetic' or paths to local datasets")
+    parser.add_argument('--n-components', nargs='+', type=int,
+                        default=[128, 512, 2048])
+    parser.add_argument('--n-features', nargs='+', type=int,
+                        default=[32, 256])
+    parser.add_argument('--n-samples', nargs='+', type=int,
+                        default=[4000])
+    parser.add_argument('--methods', nargs='+', default=METHODS,
+                        choices=METHODS)
+    parser.add_argument('--gamma', type=float, default=None,
+                        help='RBF parameter, median heuristic by default')
+    parser.add_argument('--n-gram', type=int, default=500,
+                        help='number of test samples of the Gram matrix')
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--random-state', type=int, default=0)
+    parser.add_argument('--output', default='kernel_approximation_pareto',
+                        help='prefix of the result files')
+    args = parser.parse_args()
+
+    results = []
+    for dataset in args.datasets:
+        n_features_list = (args.n_features if dataset == 'synthetic'
+                           else [None])
+        for n_samples in args.n_samples:
+            for n_features in n_features_list:
+                for n_components in args.n_components:
+                    for result in run(dataset, n_samples, n_features,
+                                      n_components, args):
+                        print("%(dataset)s n_samples=%(n_samples)d "
+                              "n_features=%(n_features)d %(method)-10s "
+                              "n_components=%(n_components)-5d "
+                              "%(throughput)10.0f rows/s "
+                              "%(peak_memory)12d B "
+                              "gram error %(gram_error).4f "
+                              "accuracy %(accuracy).4f" % result)
+                        results.append(result)
+
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.output + '.json', 'w') as f:
+        json.dump(results, f, indent=2)
+    with open(args.output + '.csv', 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+    try:
+        plot(results, args.output)
+    except ImportError:
+        print("matplotlib is not installed, the plots are skipped")
+
+
+if __name__ == '__main__':
+    main()
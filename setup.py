@@ -4,6 +4,7 @@
 import codecs
 import warnings
 import os
+import platform
 
 from setuptools import find_packages, setup, Extension
 
@@ -54,17 +55,53 @@ EXTRAS_REQUIRE = {
     ]
 }
 
+# The FHT kernels are additionally compiled for these instruction sets on
+# x86, sklearn_extra/utils/_fht_dispatch.py picks one at import time.
+SIMD_COMPILE_ARGS = {
+    'sklearn_extra.utils._cyfht_avx2': {
+        'msvc': ['/arch:AVX2'],
+        'unix': ['-mavx2', '-mfma']},
+    'sklearn_extra.utils._cyfht_avx512': {
+        'msvc': ['/arch:AVX512'],
+        'unix': ['-mavx512f', '-mavx2', '-mfma']},
+}
+IS_X86 = platform.machine().lower() in (
+    'x86_64', 'amd64', 'i386', 'i686', 'x86')
+
+
+class build_ext_simd(build_ext):
+    """Add the instruction set flags of the compiler in use."""
+
+    def build_extension(self, ext):
+        compile_args = SIMD_COMPILE_ARGS.get(ext.name)
+        if compile_args is not None:
+            compiler_type = self.compiler.compiler_type
+            ext.extra_compile_args = (
+                list(ext.extra_compile_args or []) +
+                compile_args['msvc' if compiler_type == 'msvc' else 'unix'])
+        build_ext.build_extension(self, ext)
+
+
+extensions = [
+    Extension(
+        "sklearn_extra.utils._cyfht",
+        ["sklearn_extra/utils/_cyfht.pyx"],
+        include_dirs=[np.get_include()]
+    )
+]
+if IS_X86:
+    extensions += [
+        Extension(
+            name,
+            [name.replace('.', '/') + '.pyx'],
+            include_dirs=[np.get_include()]
+        )
+        for name in sorted(SIMD_COMPILE_ARGS)
+    ]
+
 args = {
-    "ext_modules": cythonize(
-        [
-            Extension(
-                "sklearn_extra.utils._cyfht",
-                ["sklearn_extra/utils/_cyfht.pyx"],
-                include_dirs=[np.get_include()]
-            )
-        ],
-    ),
-    "cmdclass": dict(build_ext=build_ext),
+    "ext_modules": cythonize(extensions),
+    "cmdclass": dict(build_ext=build_ext_simd),
     }
 
 
@@ -1,5 +1,27 @@
-from . import kernel_approximation  # noqa
+import importlib
+import sys
 
 from ._version import __version__
 
 __all__ = ['__version__']
+
+# Submodules are imported on first attribute access (PEP 562), so that
+# importing sklearn_extra does not import scipy and scikit-learn.
+_submodules = ['cluster', 'decomposition', 'kernel_approximation',
+               'neighbors', 'random_projection', 'serving', 'utils']
+
+
+def __getattr__(name):
+    if name in _submodules:
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError('module {!r} has no attribute {!r}'
+                         .format(__name__, name))
+
+
+def __dir__():
+    return sorted(list(globals()) + _submodules)
+
+
+if sys.version_info < (3, 7):
+    # modules have no __getattr__ before Python 3.7
+    from . import kernel_approximation  # noqa
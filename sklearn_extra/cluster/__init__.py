@@ -0,0 +1,4 @@
+from ._kernel_kmeans import FastfoodKernelKMeans
+
+
+__all__ = ['FastfoodKernelKMeans']
@@ -0,0 +1,141 @@
+# License: BSD 3 clause
+
+import numpy as np
+
+from sklearn.base import BaseEstimator
+from sklearn.base import ClusterMixin
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.utils import check_array, check_random_state, gen_batches
+
+from ..kernel_approximation import Fastfood
+
+
+class FastfoodKernelKMeans(BaseEstimator, ClusterMixin):
+    """Kernel k-means clustering with an RBF kernel approximated by Fastfood.
+
+    The samples are mapped by the Fastfood approximation of the RBF kernel
+    feature map and clustered by mini-batch k-means in that feature space.
+    Mini-batches are transformed on the fly, so the transformed data is never
+    held in memory at once and neither is the O(n_samples^2) kernel matrix.
+    Time and memory are linear in n_samples.
+
+    Parameters
+    ----------
+    n_clusters : int, default: 8
+        The number of clusters to form.
+
+    sigma : float
+        Parameter of RBF kernel: exp(-(1/(2*sigma^2)) * x^2)
+
+    n_components : int
+        Number of Monte Carlo samples per original feature of the Fastfood
+        feature map.
+
+    tradeoff_mem_accuracy : "accuracy" or "mem", default: 'accuracy'
+        Tradeoff of the Fastfood feature map, see Fastfood.
+
+    batch_size : int, default: 1024
+        Number of samples transformed and used to update the centroids at
+        once.  Must be at least n_clusters.
+
+    max_iter : int, default: 10
+        Number of passes over the data.
+
+    random_state : {int, RandomState}, optional
+        If int, random_state is the seed used by the random number generator;
+        if RandomState instance, random_state is the random number generator.
+
+    Attributes
+    ----------
+    cluster_centers_ : array, shape (n_clusters, n_features_new)
+        Coordinates of the cluster centers in the Fastfood feature space.
+
+    labels_ : array, shape (n_samples,)
+        Labels of each training sample.
+
+    inertia_ : float
+        Sum of squared distances of the training samples in the feature space
+        to their closest cluster center.
+
+    """
+
+    def __init__(self,
+                 n_clusters=8,
+                 sigma=np.sqrt(1/2),
+                 n_components=100,
+                 tradeoff_mem_accuracy='accuracy',
+                 batch_size=1024,
+                 max_iter=10,
+                 random_state=None):
+        self.n_clusters = n_clusters
+        self.sigma = sigma
+        self.n_components = n_components
+        self.tradeoff_mem_accuracy = tradeoff_mem_accuracy
+        self.batch_size = batch_size
+        self.max_iter = max_iter
+        self.random_state = random_state
+
+    def _predict_and_inertia(self, X):
+        labels = np.empty(X.shape[0], dtype=np.intp)
+        inertia = 0.
+        for batch in gen_batches(X.shape[0], self.batch_size):
+            distances = self._kmeans.transform(
+                self._fastfood.transform(X[batch]))
+            labels[batch] = distances.argmin(axis=1)
+            inertia += np.sum(distances.min(axis=1) ** 2)
+        return labels, inertia
+
+    def fit(self, X, y=None):
+        """Compute the clusters of X by mini-batch k-means.
+
+        Parameters
+        ----------
+        X : {array-like}, shape (n_samples, n_features)
+            Training data, where n_samples in the number of samples
+            and n_features is the number of features.
+
+        Returns
+        -------
+        self : object
+            Returns the fitted estimator.
+        """
+        X = check_array(X, dtype=np.float64)
+        if self.batch_size < self.n_clusters:
+            raise ValueError("batch_size must be at least n_clusters, got "
+                             "batch_size=%r and n_clusters=%r"
+                             % (self.batch_size, self.n_clusters))
+        rng = check_random_state(self.random_state)
+
+        self._fastfood = Fastfood(
+            sigma=self.sigma, n_components=self.n_components,
+            tradeoff_mem_accuracy=self.tradeoff_mem_accuracy,
+            random_state=rng).fit(X)
+        self._kmeans = MiniBatchKMeans(n_clusters=self.n_clusters,
+                                       batch_size=self.batch_size,
+                                       random_state=rng)
+        for _ in range(self.max_iter):
+            permutation = rng.permutation(X.shape[0])
+            for batch in gen_batches(X.shape[0], self.batch_size):
+                self._kmeans.partial_fit(
+                    self._fastfood.transform(X[permutation[batch]]))
+
+        self.cluster_centers_ = self._kmeans.cluster_centers_
+        self.labels_, self.inertia_ = self._predict_and_inertia(X)
+        return self
+
+    def predict(self, X):
+        """Predict the closest cluster each sample in X belongs to.
+
+        Parameters
+        ----------
+        X : {array-like}, shape (n_samples, n_features)
+            New data, where n_samples in the number of samples
+            and n_features is the number of features.
+
+        Returns
+        -------
+        labels : array, shape (n_samples,)
+            Index of the cluster each sample belongs to.
+        """
+        X = check_array(X, dtype=np.float64)
+        return self._predict_and_inertia(X)[0]
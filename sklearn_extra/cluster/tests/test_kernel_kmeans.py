@@ -0,0 +1,31 @@
+import pytest
+import numpy.testing as npt
+
+from sklearn.datasets import make_blobs
+from sklearn.metrics import adjusted_rand_score
+
+from sklearn_extra.cluster import FastfoodKernelKMeans
+
+
+X, y = make_blobs(n_samples=300, centers=3, cluster_std=0.5, random_state=0)
+
+
+def test_kernel_kmeans_blobs():
+    kmeans = FastfoodKernelKMeans(n_clusters=3, sigma=2., n_components=256,
+                                  batch_size=100, random_state=0).fit(X)
+    assert kmeans.cluster_centers_.shape == (3, 512)
+    assert adjusted_rand_score(y, kmeans.labels_) == 1.
+    npt.assert_array_equal(kmeans.labels_, kmeans.predict(X))
+    assert kmeans.inertia_ > 0
+
+
+def test_kernel_kmeans_fit_predict_deterministic():
+    kmeans = FastfoodKernelKMeans(n_clusters=3, batch_size=50, max_iter=2,
+                                  random_state=0)
+    npt.assert_array_equal(kmeans.fit_predict(X), kmeans.fit_predict(X))
+
+
+def test_kernel_kmeans_batch_size_smaller_than_n_clusters():
+    kmeans = FastfoodKernelKMeans(n_clusters=10, batch_size=5)
+    with pytest.raises(ValueError, match='batch_size'):
+        kmeans.fit(X)
@@ -0,0 +1,4 @@
+from ._kernel_pca import FastfoodKernelPCA
+
+
+__all__ = ['FastfoodKernelPCA']
@@ -0,0 +1,230 @@
+# License: BSD 3 clause
+
+import numpy as np
+from scipy import linalg
+
+from sklearn.base import BaseEstimator
+from sklearn.base import TransformerMixin
+from sklearn.utils import check_array, check_random_state, gen_batches
+
+from ..kernel_approximation import Fastfood
+
+
+class FastfoodKernelPCA(BaseEstimator, TransformerMixin):
+    """Kernel PCA with an RBF kernel approximated by Fastfood.
+
+    The samples are mapped by the Fastfood approximation of the RBF kernel
+    feature map and the principal components are computed in that feature
+    space.  Batches of samples are transformed on the fly and only their
+    mean and the scatter matrix of their features are accumulated, so that
+    neither the transformed data nor the O(n_samples^2) kernel matrix is held
+    in memory at once.  Time and memory are linear in n_samples, and the
+    model can be updated with partial_fit.  The eigendecomposition of the
+    scatter matrix is only computed when the components are first needed
+    after an update, so that partial_fit only costs the transformation.
+
+    Parameters
+    ----------
+    n_components : int, default: 2
+        Number of principal components to keep.
+
+    sigma : float
+        Parameter of RBF kernel: exp(-(1/(2*sigma^2)) * x^2)
+
+    n_random_features : int, default: 100
+        Number of Monte Carlo samples per original feature of the Fastfood
+        feature map.  The scatter matrix is of the size of the feature space,
+        that is 2*n_random_features with tradeoff_mem_accuracy='accuracy'.
+
+    tradeoff_mem_accuracy : "accuracy" or "mem", default: 'accuracy'
+        Tradeoff of the Fastfood feature map, see Fastfood.
+
+    batch_size : int, default: 1024
+        Number of samples transformed at once by fit and transform.
+
+    random_state : {int, RandomState}, optional
+        If int, random_state is the seed used by the random number generator;
+        if RandomState instance, random_state is the random number generator.
+
+    Attributes
+    ----------
+    components_ : array, shape (n_components, n_features_new)
+        Principal axes in the Fastfood feature space, sorted by decreasing
+        explained variance.
+
+    explained_variance_ : array, shape (n_components,)
+        Variance of the training samples along each of the components.
+
+    explained_variance_ratio_ : array, shape (n_components,)
+        Fraction of the total variance in the feature space explained by each
+        of the components.
+
+    mean_ : array, shape (n_features_new,)
+        Mean of the training samples in the feature space.
+
+    n_samples_seen_ : int
+        Number of training samples processed.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from sklearn_extra.decomposition import FastfoodKernelPCA
+    >>> X = np.random.RandomState(0).random_sample((100, 5))
+    >>> pca = FastfoodKernelPCA(n_components=3, random_state=0).fit(X)
+    >>> pca.transform(X).shape
+    (100, 3)
+    """
+
+    def __init__(self,
+                 n_components=2,
+                 sigma=np.sqrt(1/2),
+                 n_random_features=100,
+                 tradeoff_mem_accuracy='accuracy',
+                 batch_size=1024,
+                 random_state=None):
+        self.n_components = n_components
+        self.sigma = sigma
+        self.n_random_features = n_random_features
+        self.tradeoff_mem_accuracy = tradeoff_mem_accuracy
+        self.batch_size = batch_size
+        self.random_state = random_state
+
+    def fit(self, X, y=None):
+        """Compute the principal components of X in the feature space.
+
+        Parameters
+        ----------
+        X : {array-like}, shape (n_samples, n_features)
+            Training data, where n_samples in the number of samples
+            and n_features is the number of features.
+
+        Returns
+        -------
+        self : object
+            Returns the transformer.
+        """
+        X = check_array(X, dtype=np.float64)
+        self._reset()
+        for batch in gen_batches(X.shape[0], self.batch_size):
+            self._accumulate(X[batch])
+        self._check_n_components()
+        return self
+
+    def partial_fit(self, X, y=None):
+        """Update the principal components with the samples of X.
+
+        Parameters
+        ----------
+        X : {array-like}, shape (n_samples, n_features)
+            Batch of training data, where n_samples in the number of samples
+            and n_features is the number of features.
+
+        Returns
+        -------
+        self : object
+            Returns the transformer.
+        """
+        X = check_array(X, dtype=np.float64)
+        if not hasattr(self, '_fastfood'):
+            self._reset()
+        for batch in gen_batches(X.shape[0], self.batch_size):
+            self._accumulate(X[batch])
+        self._check_n_components()
+        return self
+
+    def _reset(self):
+        self._fastfood = Fastfood(
+            sigma=self.sigma, n_components=self.n_random_features,
+            tradeoff_mem_accuracy=self.tradeoff_mem_accuracy,
+            random_state=check_random_state(self.random_state))
+        self.n_samples_seen_ = 0
+        self.mean_ = None
+        self._scatter = None
+        self._eigenpairs = None
+
+    def _accumulate(self, X):
+        """ Merge the mean and scatter matrix of a batch (Chan et al.) """
+        if self.n_samples_seen_ == 0:
+            self._fastfood.fit(X)
+        features = self._fastfood.transform(X)
+        batch_mean = features.mean(axis=0)
+        features -= batch_mean
+        batch_scatter = np.dot(features.T, features)
+        n_batch = features.shape[0]
+        if self.n_samples_seen_ == 0:
+            self.mean_ = batch_mean
+            self._scatter = batch_scatter
+        else:
+            n_total = self.n_samples_seen_ + n_batch
+            delta = batch_mean - self.mean_
+            self._scatter += batch_scatter
+            self._scatter += (np.outer(delta, delta) *
+                              (self.n_samples_seen_ * n_batch / n_total))
+            self.mean_ += delta * (n_batch / n_total)
+        self.n_samples_seen_ += n_batch
+        # the components are only recomputed when they are needed
+        self._eigenpairs = None
+
+    def _check_n_components(self):
+        n_features_new = self._scatter.shape[0]
+        if not 1 <= self.n_components <= n_features_new:
+            raise ValueError("n_components must be between 1 and the number "
+                             "of features in the feature space %d, got %r"
+                             % (n_features_new, self.n_components))
+
+    def _eigendecomposition(self):
+        """ Components, their variances and ratios of the total variance """
+        if self._eigenpairs is not None:
+            return self._eigenpairs
+        self._check_n_components()
+        n_features_new = self._scatter.shape[0]
+        covariance = self._scatter / max(self.n_samples_seen_ - 1, 1)
+        indices = [n_features_new - self.n_components, n_features_new - 1]
+        try:
+            eigenvalues, eigenvectors = linalg.eigh(covariance,
+                                                    subset_by_index=indices)
+        except TypeError:
+            # scipy < 1.5 names subset_by_index eigvals
+            eigenvalues, eigenvectors = linalg.eigh(covariance,
+                                                    eigvals=indices)
+        eigenvalues = np.maximum(eigenvalues[::-1], 0.)
+        components = eigenvectors[:, ::-1].T
+        # deterministic signs: largest entry of each component is positive
+        largest = np.argmax(np.abs(components), axis=1)
+        signs = np.sign(components[np.arange(self.n_components), largest])
+        self._eigenpairs = (components * signs[:, np.newaxis], eigenvalues,
+                            eigenvalues / np.trace(covariance))
+        return self._eigenpairs
+
+    @property
+    def components_(self):
+        return self._eigendecomposition()[0]
+
+    @property
+    def explained_variance_(self):
+        return self._eigendecomposition()[1]
+
+    @property
+    def explained_variance_ratio_(self):
+        return self._eigendecomposition()[2]
+
+    def transform(self, X):
+        """Project X on the principal components in the feature space.
+
+        Parameters
+        ----------
+        X : {array-like}, shape (n_samples, n_features)
+            New data, where n_samples in the number of samples
+            and n_features is the number of features.
+
+        Returns
+        -------
+        X_new : array, shape (n_samples, n_components)
+        """
+        X = check_array(X, dtype=np.float64)
+        X_new = np.empty((X.shape[0], self.n_components))
+        for batch in gen_batches(X.shape[0], self.batch_size):
+            features = self._fastfood.transform(X[batch])
+            features -= self.mean_
+            X_new[batch] = np.dot(features, self.components_.T)
+        return X_new
@@ -0,0 +1,84 @@
+import pytest
+import numpy as np
+import numpy.testing as npt
+from scipy import linalg
+
+from sklearn.decomposition import KernelPCA, PCA
+
+from sklearn_extra.decomposition import FastfoodKernelPCA
+
+
+rng = np.random.RandomState(0)
+X = rng.random_sample(size=(300, 10))
+
+
+def test_kernel_pca_matches_pca_on_features():
+    kpca = FastfoodKernelPCA(n_components=5, sigma=2., n_random_features=64,
+                             batch_size=32, random_state=0).fit(X)
+    features = kpca._fastfood.transform(X)
+    pca = PCA(n_components=5, svd_solver='full').fit(features)
+    npt.assert_allclose(kpca.explained_variance_, pca.explained_variance_)
+    npt.assert_allclose(kpca.explained_variance_ratio_,
+                        pca.explained_variance_ratio_)
+    npt.assert_allclose(kpca.mean_, pca.mean_, atol=1e-12)
+    X_new = kpca.transform(X)
+    X_pca = pca.transform(features)
+    npt.assert_allclose(np.abs(X_new), np.abs(X_pca), atol=1e-10)
+    assert kpca.n_samples_seen_ == X.shape[0]
+
+
+def test_kernel_pca_partial_fit():
+    kpca = FastfoodKernelPCA(n_components=4, random_state=0).fit(X)
+    streamed = FastfoodKernelPCA(n_components=4, random_state=0)
+    for batch in np.array_split(X, 7):
+        streamed.partial_fit(batch)
+    npt.assert_allclose(streamed.explained_variance_,
+                        kpca.explained_variance_)
+    npt.assert_allclose(streamed.transform(X), kpca.transform(X),
+                        atol=1e-10)
+
+
+def test_kernel_pca_partial_fit_defers_eigendecomposition():
+    kpca = FastfoodKernelPCA(n_components=4, random_state=0)
+    kpca.partial_fit(X[:50])
+    assert kpca._eigenpairs is None
+    components = kpca.components_
+    assert kpca._eigenpairs is not None
+    kpca.partial_fit(X[50:])
+    assert kpca._eigenpairs is None
+    assert components.shape == kpca.components_.shape
+
+
+def test_kernel_pca_approximates_kernel_pca():
+    sigma = 1.
+    kpca = FastfoodKernelPCA(n_components=3, sigma=sigma,
+                             n_random_features=1024, random_state=0).fit(X)
+    exact = KernelPCA(n_components=3, kernel='rbf',
+                      gamma=1 / (2 * sigma ** 2)).fit(X)
+    eigenvalues = exact.eigenvalues_ / (X.shape[0] - 1)
+    npt.assert_allclose(kpca.explained_variance_, eigenvalues, rtol=0.1)
+
+
+def test_kernel_pca_n_components_too_large():
+    kpca = FastfoodKernelPCA(n_components=1000, n_random_features=16)
+    with pytest.raises(ValueError, match='n_components'):
+        kpca.fit(X)
+
+
+def test_kernel_pca_eigh_without_subset_by_index(monkeypatch):
+    # scipy < 1.5 only has the eigvals argument
+    eigh = linalg.eigh
+
+    def old_eigh(a, eigvals=None, **kwargs):
+        if 'subset_by_index' in kwargs:
+            raise TypeError('unexpected keyword argument')
+        return eigh(a, subset_by_index=eigvals, **kwargs)
+
+    expected = FastfoodKernelPCA(n_components=4, random_state=0).fit(X)
+    # the eigendecomposition is only computed on access
+    expected.components_
+    monkeypatch.setattr(linalg, 'eigh', old_eigh)
+    kpca = FastfoodKernelPCA(n_components=4, random_state=0).fit(X)
+    npt.assert_allclose(kpca.explained_variance_,
+                        expected.explained_variance_)
+    npt.assert_allclose(kpca.components_, expected.components_)
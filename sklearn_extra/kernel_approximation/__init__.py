@@ -1,4 +1,7 @@
-from ._fastfood import Fastfood
+from ._arc_cosine import FastfoodArcCosine
+from ._fastfood import Fastfood, transform_many
+from ._mean_embedding import FastfoodMeanEmbedding
 
 
-__all__ = ['Fastfood']
+__all__ = ['Fastfood', 'FastfoodArcCosine', 'FastfoodMeanEmbedding',
+           'transform_many']
@@ -0,0 +1,117 @@
+# License: BSD 3 clause
+
+import numpy as np
+
+from sklearn.base import BaseEstimator
+from sklearn.base import TransformerMixin
+from sklearn.utils import check_array
+
+from ._fastfood import Fastfood
+
+
+class FastfoodArcCosine(BaseEstimator, TransformerMixin):
+    """Approximates feature map of an arc-cosine kernel with the Fastfood
+    projection.
+
+    The arc-cosine kernel of order n is the kernel of an infinitely wide
+    layer of a neural network with a step (n=0), ReLU (n=1) or squared ReLU
+    (n=2) activation and Gaussian weights:
+
+        k_n(x, y) = 1/pi * |x|^n * |y|^n * J_n(theta)
+
+    where theta is the angle between x and y.  The features apply the
+    activation to a Gaussian random projection of the data, which is the
+    structured projection of Fastfood, so that mapping a single example is
+    O(n_components log d) instead of O(n_components d) for a dense random
+    matrix.
+
+    Parameters
+    ----------
+    order : {0, 1, 2}, default: 1
+        Order of the arc-cosine kernel, i.e. step, ReLU or squared ReLU
+        activation.
+
+    n_components : int
+        Number of Monte Carlo samples per original feature.
+        Equals the dimensionality of the computed feature space.
+
+    random_state : {int, RandomState, Generator}, optional
+        If int, random_state is the seed used by the random number generator;
+        if RandomState or Generator instance, random_state is the random
+        number generator.
+
+    Notes
+    -----
+    See "Kernel Methods for Deep Learning" by Youngmin Cho and Lawrence
+    Saul.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from sklearn_extra.kernel_approximation import FastfoodArcCosine
+    >>> X = np.random.RandomState(0).random_sample((10, 5))
+    >>> FastfoodArcCosine(order=1, n_components=64,
+    ...                   random_state=0).fit_transform(X).shape
+    (10, 64)
+    """
+
+    def __init__(self, order=1, n_components=100, random_state=None):
+        self.order = order
+        self.n_components = n_components
+        self.random_state = random_state
+
+    def fit(self, X, y=None):
+        """Fit the model with X.
+
+        Samples the random blocks of the Fastfood projection.
+
+        Parameters
+        ----------
+        X : {array-like}, shape (n_samples, n_features)
+            Training data, where n_samples in the number of samples
+            and n_features is the number of features.  Only the number of
+            features is used.
+
+        Returns
+        -------
+        self : object
+            Returns the transformer.
+        """
+        if self.order not in (0, 1, 2):
+            raise ValueError("order must be 0, 1 or 2, got %r" % self.order)
+        X = check_array(X, dtype=None)
+        # unit bandwidth gives a projection with standard Gaussian rows
+        self._fastfood = Fastfood(
+            sigma=1., n_components=self.n_components,
+            tradeoff_mem_accuracy='mem',
+            random_state=self.random_state).fit(X)
+        return self
+
+    def transform(self, X):
+        """Apply the approximate feature map to X.
+
+        Parameters
+        ----------
+        X : {array-like}, shape (n_samples, n_features)
+            New data, where n_samples in the number of samples
+            and n_features is the number of features.
+
+        Returns
+        -------
+        X_new : array-like, shape (n_samples, n_components)
+        """
+        X = check_array(X, dtype=np.float64)
+        fastfood = self._fastfood
+        fastfood._check_n_features(X)
+        HGPHBX = fastfood._apply_approximate_gaussian_matrix(
+            fastfood._B, fastfood._G, fastfood._P, X)
+        WX = fastfood._scale_transformed_data(fastfood._S, HGPHBX)
+        positive = WX > 0
+        if self.order == 0:
+            X_new = positive.astype(np.float64)
+        else:
+            X_new = np.multiply(WX, positive, out=WX)
+            if self.order == 2:
+                X_new *= X_new
+        X_new *= np.sqrt(2. / fastfood._n)
+        return X_new
@@ -1,13 +1,32 @@
 # License: BSD 3 clause
 
+import numbers
+from time import perf_counter
+
 import numpy as np
-from scipy.stats import chi
 
 from sklearn.base import BaseEstimator
 from sklearn.base import TransformerMixin
+from sklearn.base import clone
+from sklearn.metrics.pairwise import rbf_kernel
 from sklearn.utils import check_array, check_random_state
+from sklearn.utils.validation import check_memory
+
+from ..utils._fht_dispatch import fht2 as cyfht
+from ..utils._fht_dispatch import fht2_interleaved as cyfht_interleaved
+from ..utils._fht_dispatch import fht2_pruned as cyfht_pruned
+
+# Rows of at most this length are transformed in interleaved blocks, which
+# vectorises the butterflies across rows, if there are enough of them.
+_INTERLEAVED_FHT_MAX_D = 256
+_INTERLEAVED_FHT_MIN_ROWS = 64
 
-from ..utils._cyfht import fht2 as cyfht
+# number of timings of transform per candidate in auto_tune, the fastest one
+# is kept
+_AUTO_TUNE_REPEATS = 3
+
+_OUTPUT_DTYPES = [np.dtype(dtype) for dtype in
+                  (np.float64, np.float32, np.float16, np.int8, np.int16)]
 
 
 class Fastfood(BaseEstimator, TransformerMixin):
@@ -37,9 +56,46 @@ class Fastfood(BaseEstimator, TransformerMixin):
         accuracy:   The final feature space is of dimension 2*n_components,
                     while being more accurate and consuming more memory.
 
-    random_state : {int, RandomState}, optional
+    random_state : {int, RandomState, Generator}, optional
         If int, random_state is the seed used by the random number generator;
-        if RandomState instance, random_state is the random number generator.
+        if RandomState or Generator instance, random_state is the random
+        number generator.
+
+    memory : None, str or object with the joblib.Memory interface, optional
+        Used to cache the sampled random blocks and the transformed data.
+        By default, no caching is performed. If a string is given, it is the
+        path to the caching directory.  Transformed data is cached per fitted
+        state and input data, so that e.g. the folds of a grid search over a
+        downstream estimator do not recompute the same feature matrices.  The
+        random blocks are only cached if random_state is an int.
+
+    cache_bytes_limit : int, optional
+        Maximum size in bytes of the cache directory of memory.  The least
+        recently accessed entries are evicted once the limit is exceeded.
+        By default, the cache is unbounded.
+
+    output_dtype : {None, float64, float32, float16, int8, int16}, optional
+        Data type of the transformed data, float64 by default.  The features
+        are bounded by their scale factor, so that they can be stored with
+        less precision.  Integer types hold the features quantised to the
+        full range of the type; use dequantize to convert them back.
+
+    sampling : "mc", "qmc" or "orthogonal", default: 'mc'
+        mc:         G and S are drawn by plain Monte Carlo sampling.
+        qmc:        G and S are computed from a scrambled Sobol sequence,
+                    which stratifies the Gaussian and chi draws of every
+                    block.  Requires scipy >= 1.7.
+        orthogonal: G holds random signs, so that the rows of every block of
+                    the projection are exactly orthogonal, while S still
+                    gives them chi distributed lengths.
+        The last two reduce the variance of the kernel approximation, i.e.
+        reach the same error with fewer components.
+
+    Attributes
+    ----------
+    n_features_in_ : int
+        Number of features of the data the model was fitted on, and that
+        transform accepts.
 
     Notes
     -----
@@ -58,13 +114,21 @@ class Fastfood(BaseEstimator, TransformerMixin):
                  sigma=np.sqrt(1/2),
                  n_components=100,
                  tradeoff_mem_accuracy='accuracy',
-                 random_state=None):
+                 random_state=None,
+                 memory=None,
+                 cache_bytes_limit=None,
+                 output_dtype=None,
+                 sampling='mc'):
         self.sigma = sigma
         self.n_components = n_components
         self.random_state = random_state
         # map to 2*n_components features or to n_components features with less
         # accuracy
         self.tradeoff_mem_accuracy = tradeoff_mem_accuracy
+        self.memory = memory
+        self.cache_bytes_limit = cache_bytes_limit
+        self.output_dtype = output_dtype
+        self.sampling = sampling
 
     @staticmethod
     def _is_number_power_of_two(n):
@@ -83,63 +147,139 @@ class Fastfood(BaseEstimator, TransformerMixin):
             times_to_stack_v = int(divisor+1)
         return int(d), int(n), times_to_stack_v
 
-    def _pad_with_zeros(self, X):
-        try:
-            X_padded = np.pad(
-                X,
-                ((0, 0),
-                 (0, self._number_of_features_to_pad_with_zeros)),
-                'constant')
-        except AttributeError:
-            zeros = np.zeros((X.shape[0],
-                              self._number_of_features_to_pad_with_zeros))
-            X_padded = np.concatenate((X, zeros), axis=1)
-
-        return X_padded
-
     @staticmethod
-    def _approx_fourier_transformation_multi_dim(result):
-        cyfht(result)
+    def _approx_fourier_transformation_multi_dim(result, n_nonzero=None):
+        """ FHT of the rows of result, of which only the first n_nonzero
+        values are set if given, the others being zeros """
+        if (result.shape[1] <= _INTERLEAVED_FHT_MAX_D and
+                result.shape[0] >= _INTERLEAVED_FHT_MIN_ROWS):
+            if n_nonzero is not None:
+                result[:, n_nonzero:] = 0
+            cyfht_interleaved(result)
+        elif n_nonzero is not None:
+            cyfht_pruned(result, n_nonzero)
+        else:
+            cyfht(result)
+
+    def _check_n_features(self, X):
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError("X has %d features, but Fastfood was fitted "
+                             "with %d features" % (X.shape[1],
+                                                   self.n_features_in_))
 
     @staticmethod
     def _l2norm_along_axis1(X):
         return np.sqrt(np.einsum('ij,ij->i', X, X))
 
-    def _uniform_vector(self, rng):
-        if self.tradeoff_mem_accuracy != 'accuracy':
-            return rng.uniform(0, 2 * np.pi, size=self._n)
-        else:
-            return None
-
     def _apply_approximate_gaussian_matrix(self, B, G, P, X):
-        """ Create mapping of all x_i by applying B, G and P step-wise """
-        num_examples = X.shape[0]
+        """ Create mapping of all x_i by applying B, G and P step-wise
 
-        result = np.multiply(B, X.reshape((1, num_examples, 1, self._d)))
-        result = result.reshape((num_examples*self._times_to_stack_v, self._d))
-        Fastfood._approx_fourier_transformation_multi_dim(result)
+        The number of stacked blocks is taken from B, so that blocks of
+        several models can be applied at once.  X may have less features
+        than the blocks, the missing ones are zeros, which are neither
+        padded nor transformed.
+        """
+        num_examples, n_features = X.shape
+        times_to_stack_v, d = B.shape
+
+        result = np.empty((num_examples, times_to_stack_v, d),
+                          dtype=np.result_type(B, X))
+        # broadcasting a view of X does not copy X whatever its memory layout
+        np.multiply(B[:, :n_features], X[:, np.newaxis, :],
+                    out=result[:, :, :n_features])
+        result = result.reshape((num_examples*times_to_stack_v, d))
+        Fastfood._approx_fourier_transformation_multi_dim(
+            result, n_features if n_features < d else None)
         result = result.reshape((num_examples, -1))
         np.take(result, P, axis=1, mode='wrap', out=result)
-        np.multiply(np.ravel(G), result.reshape(num_examples, self._n),
-                    out=result)
-        result = result.reshape(num_examples*self._times_to_stack_v, self._d)
+        np.multiply(np.ravel(G), result, out=result)
+        result = result.reshape(num_examples*times_to_stack_v, d)
         Fastfood._approx_fourier_transformation_multi_dim(result)
         return result
 
-    def _scale_transformed_data(self, S, VX):
+    def _scale_transformed_data(self, S, VX, sigma=None):
         """ Scale mapped data VX to match kernel(e.g. RBF-Kernel) """
+        if sigma is None:
+            sigma = self.sigma
         VX = VX.reshape(-1, self._times_to_stack_v*self._d)
 
-        return (1 / (self.sigma * np.sqrt(self._d)) *
+        return (1 / (sigma * np.sqrt(self._d)) *
                 np.multiply(np.ravel(S), VX))
 
-    def _phi(self, X):
+    def _check_output_dtype(self):
+        dtype = np.dtype(np.float64 if self.output_dtype is None
+                         else self.output_dtype)
+        if dtype not in _OUTPUT_DTYPES:
+            raise ValueError("output_dtype must be one of %s, got %r"
+                             % (', '.join(map(str, _OUTPUT_DTYPES)),
+                                self.output_dtype))
+        return dtype
+
+    def _feature_scale(self):
+        """ Bound of the absolute value of the features """
+        if self.tradeoff_mem_accuracy == 'accuracy':
+            return 1 / np.sqrt(self._n)
+        else:
+            return np.sqrt(2. / self._n)
+
+    def _phi(self, X, out=None):
+        dtype = self._check_output_dtype()
+        n = X.shape[1]
         if self.tradeoff_mem_accuracy == 'accuracy':
-            return (1 / np.sqrt(X.shape[1])) * \
-                np.hstack([np.cos(X), np.sin(X)])
+            X_new = (np.empty((X.shape[0], 2 * n), dtype=dtype)
+                     if out is None else out)
+            parts = [(np.sin, X_new[:, n:]), (np.cos, X_new[:, :n])]
         else:
-            np.cos(X+self._U, X)
-            return X * np.sqrt(2. / X.shape[1])
+            np.add(X, self._U, out=X)
+            X_new = np.empty(X.shape, dtype=dtype) if out is None else out
+            parts = [(np.cos, X_new)]
+
+        # the ufuncs write into X_new in its final dtype; the last part is
+        # computed in-place in X, which is not needed anymore
+        for i, (function, X_part) in enumerate(parts):
+            if dtype.kind == 'f':
+                function(X, out=X_part, casting='same_kind')
+                X_part *= self._feature_scale()
+            else:
+                values = function(X, out=X if i == len(parts) - 1 else None)
+                values *= np.iinfo(dtype).max
+                np.rint(values, out=X_part, casting='unsafe')
+        return X_new
+
+    def dequantize(self, X_new):
+        """Convert transformed data back to float64 features.
+
+        Parameters
+        ----------
+        X_new : array-like, shape (n_samples, n_components)
+            Output of transform with any output_dtype.
+
+        Returns
+        -------
+        X_new : array, shape (n_samples, n_components)
+            The features as float64.  Quantised features are accurate up to
+            half a quantisation step of the feature scale.
+        """
+        X_new = np.asarray(X_new)
+        if X_new.dtype.kind in 'iu':
+            return X_new * (self._feature_scale() /
+                            np.iinfo(X_new.dtype).max)
+        return X_new.astype(np.float64)
+
+    def _cache_key(self):
+        return {key: value for key, value in vars(self).items()
+                if key not in ('memory', 'cache_bytes_limit')}
+
+    def _reduce_cache_size(self, memory):
+        if (self.cache_bytes_limit is None or
+                getattr(memory, 'location', None) is None):
+            return
+        try:
+            memory.reduce_size(bytes_limit=self.cache_bytes_limit)
+        except TypeError:
+            # joblib < 1.3 reads the limit from the Memory object itself
+            memory.bytes_limit = self.cache_bytes_limit
+            memory.reduce_size()
 
     def fit(self, X, y=None):
         """Fit the model with X.
@@ -151,40 +291,164 @@ class Fastfood(BaseEstimator, TransformerMixin):
         ----------
         X : {array-like}, shape (n_samples, n_features)
             Training data, where n_samples in the number of samples
-            and n_features is the number of features.
+            and n_features is the number of features.  Only the number of
+            features is used, X is neither converted nor copied.
 
         Returns
         -------
         self : object
             Returns the transformer.
         """
-        X = check_array(X, dtype=np.float64)
+        X = check_array(X, dtype=None)
+        return self.fit_from_n_features(X.shape[1])
+
+    def fit_from_n_features(self, n_features):
+        """Fit the model for data with n_features features.
+
+        Samples the random blocks as fit does, without requiring training
+        data.
+
+        Parameters
+        ----------
+        n_features : int
+            Number of features of the data to transform.
 
-        d_orig = X.shape[1]
-        rng = check_random_state(self.random_state)
+        Returns
+        -------
+        self : object
+            Returns the transformer.
+        """
+        if self.sampling not in ('mc', 'qmc', 'orthogonal'):
+            raise ValueError("sampling must be 'mc', 'qmc' or 'orthogonal', "
+                             "got %r" % self.sampling)
+        self._check_output_dtype()
+        memory = check_memory(self.memory)
 
         self._d, self._n, self._times_to_stack_v = \
-            Fastfood._enforce_dimensionality_constraints(d_orig,
+            Fastfood._enforce_dimensionality_constraints(n_features,
                                                          self.n_components)
-        self._number_of_features_to_pad_with_zeros = self._d - d_orig
-
-        self._G = rng.normal(size=(self._times_to_stack_v, self._d))
-        self._B = rng.choice(
-                [-1, 1],
-                size=(self._times_to_stack_v, self._d),
-                replace=True)
-        self._P = np.hstack([(i*self._d) + rng.permutation(self._d)
-                            for i in range(self._times_to_stack_v)])
-        self._S = np.multiply(1 / self._l2norm_along_axis1(self._G)
-                              .reshape((-1, 1)),
-                              chi.rvs(self._d,
-                                      size=(self._times_to_stack_v, self._d),
-                                      random_state=rng))
-
-        self._U = self._uniform_vector(rng)
+        self._number_of_features_to_pad_with_zeros = self._d - n_features
+        self.n_features_in_ = n_features
+
+        sample_blocks = _sample_fastfood_blocks
+        if isinstance(self.random_state, numbers.Integral):
+            # only a fixed seed makes the sampled blocks reproducible
+            sample_blocks = memory.cache(sample_blocks)
+        self._G, self._B, self._P, self._S, self._U = sample_blocks(
+            self._d, self._times_to_stack_v, self.tradeoff_mem_accuracy,
+            self.random_state, self.sampling)
+        self._reduce_cache_size(memory)
 
         return self
 
+    def _truncated(self, times_to_stack_v):
+        """ Unfitted copy without memory, fitted with the first blocks """
+        fastfood = clone(self).set_params(
+            n_components=times_to_stack_v * self._d, memory=None)
+        fastfood._d = self._d
+        fastfood._n = times_to_stack_v * self._d
+        fastfood._times_to_stack_v = times_to_stack_v
+        fastfood._number_of_features_to_pad_with_zeros = \
+            self._number_of_features_to_pad_with_zeros
+        fastfood.n_features_in_ = self.n_features_in_
+        fastfood._G = self._G[:times_to_stack_v]
+        fastfood._B = self._B[:times_to_stack_v]
+        fastfood._P = self._P[:fastfood._n]
+        fastfood._S = self._S[:times_to_stack_v]
+        fastfood._U = None if self._U is None else self._U[:fastfood._n]
+        return fastfood
+
+    def auto_tune(self, X_sample, target_kernel_error=None,
+                  max_latency_ms=None, max_n_components=2 ** 14):
+        """Choose n_components from a kernel error and a latency budget.
+
+        The candidates are the powers of two from the number of features,
+        padded to a power of two, up to max_n_components.  The random blocks
+        are sampled once for the largest candidate; a candidate uses their
+        first n_components / d blocks, which are distributed like the blocks
+        of a Fastfood with that many components.  Each candidate is measured
+        on X_sample:
+
+        - the kernel error is the root mean squared difference between the
+          approximate and the exact RBF kernel of X_sample,
+        - the latency is the fastest of a few wall-clock timings of
+          transforming X_sample on this machine, in milliseconds.
+
+        The estimator is left fitted with the blocks of the chosen candidate
+        and n_components set to its size.
+
+        Parameters
+        ----------
+        X_sample : {array-like}, shape (n_samples, n_features)
+            Representative sample of the data.  The exact kernel takes
+            O(n_samples^2) time and memory, so a few hundred samples are
+            usually enough.
+
+        target_kernel_error : float, optional
+            If given, the smallest candidate whose kernel error is at most
+            target_kernel_error is chosen.
+
+        max_latency_ms : float, optional
+            If given, candidates whose latency exceeds max_latency_ms are
+            rejected.  Without target_kernel_error, the largest candidate
+            within the latency budget is chosen.
+
+        max_n_components : int, default: 2 ** 14
+            Size of the largest candidate.
+
+        Returns
+        -------
+        self : object
+            Returns the fitted transformer.
+        """
+        if target_kernel_error is None and max_latency_ms is None:
+            raise ValueError("At least one of target_kernel_error and "
+                             "max_latency_ms must be given")
+        X_sample = check_array(X_sample, dtype=np.float64)
+        kernel = rbf_kernel(X_sample, gamma=1 / (2 * self.sigma ** 2))
+
+        largest = clone(self).set_params(n_components=max_n_components,
+                                         memory=None)
+        largest.fit_from_n_features(X_sample.shape[1])
+
+        chosen = None
+        times_to_stack_v = 1
+        while times_to_stack_v <= largest._times_to_stack_v:
+            candidate = largest._truncated(times_to_stack_v)
+            times_to_stack_v *= 2
+
+            if max_latency_ms is not None:
+                latency_ms = np.inf
+                for _ in range(_AUTO_TUNE_REPEATS):
+                    start = perf_counter()
+                    candidate._transform(X_sample)
+                    latency_ms = min(latency_ms,
+                                     1000 * (perf_counter() - start))
+                if latency_ms > max_latency_ms:
+                    # larger candidates are slower
+                    break
+            if target_kernel_error is None:
+                chosen = candidate
+                continue
+            X_trans = candidate.dequantize(candidate._transform(X_sample))
+            kernel_error = np.sqrt(np.mean(
+                (np.dot(X_trans, X_trans.T) - kernel) ** 2))
+            if kernel_error <= target_kernel_error:
+                chosen = candidate
+                break
+
+        if chosen is None:
+            raise ValueError("No n_components up to %d meets the budget of "
+                             "target_kernel_error=%r and max_latency_ms=%r"
+                             % (max_n_components, target_kernel_error,
+                                max_latency_ms))
+        self.set_params(n_components=chosen.n_components)
+        for attr in ['_d', '_n', '_times_to_stack_v',
+                     '_number_of_features_to_pad_with_zeros', 'n_features_in_',
+                     '_G', '_B', '_P', '_S', '_U']:
+            setattr(self, attr, getattr(chosen, attr))
+        return self
+
     def transform(self, X):
         """Apply the approximate feature map to X.
 
@@ -199,8 +463,198 @@ class Fastfood(BaseEstimator, TransformerMixin):
         X_new : array-like, shape (n_samples, n_components)
         """
         X = check_array(X, dtype=np.float64)
-        X_padded = self._pad_with_zeros(X)
+        self._check_n_features(X)
+        if self.memory is None:
+            return self._transform(X)
+        memory = check_memory(self.memory)
+        misses = []
+        X_new = memory.cache(_transform_one, ignore=['fastfood', 'misses'])(
+            self, self._cache_key(), X, misses)
+        # the cache only grows, and needs to be bounded, on a cache miss
+        if misses:
+            self._reduce_cache_size(memory)
+        return X_new
+
+    def _transform(self, X):
+        self._check_n_features(X)
         HGPHBX = self._apply_approximate_gaussian_matrix(
-                self._B, self._G, self._P, X_padded)
+                self._B, self._G, self._P, X)
         VX = self._scale_transformed_data(self._S, HGPHBX)
         return self._phi(VX)
+
+    def transform_multi_sigma(self, X, sigmas):
+        """Apply the approximate feature map to X for several values of sigma.
+
+        The bandwidth only enters the feature map as a scalar factor applied
+        after both Hadamard transformations, so the expensive projection of X
+        is computed once and shared between all values of sigma.  The result
+        for each sigma equals the output of ``transform`` of a Fastfood with
+        that sigma and the same random_state.
+
+        Parameters
+        ----------
+        X : {array-like}, shape (n_samples, n_features)
+            New data, where n_samples in the number of samples
+            and n_features is the number of features.
+
+        sigmas : array-like of float
+            Values of the RBF kernel parameter sigma.
+
+        Returns
+        -------
+        X_new : list of arrays, shape (n_samples, n_components)
+            One feature matrix per value in sigmas, in the same order.
+        """
+        X = check_array(X, dtype=np.float64)
+        self._check_n_features(X)
+        HGPHBX = self._apply_approximate_gaussian_matrix(
+                self._B, self._G, self._P, X)
+        return [self._phi(self._scale_transformed_data(self._S, HGPHBX,
+                                                       sigma))
+                for sigma in np.ravel(sigmas)]
+
+
+def transform_many(models, X):
+    """Apply the feature maps of several fitted Fastfood models to X at once.
+
+    X is validated once, and the random blocks of all models are
+    stacked, so that the Hadamard transformations of all models run as a
+    single call over one buffer.  The features of the models are written
+    next to each other, in the order of models, into a single output array.
+    The result equals the concatenation of the outputs of transform of the
+    models, which are however not cached in their memory.
+
+    Parameters
+    ----------
+    models : sequence of fitted Fastfood
+        Models fitted on data with the same number of features, and with the
+        same output_dtype.  They can differ in every other parameter, e.g.
+        in random_state, sigma and n_components.
+
+    X : {array-like}, shape (n_samples, n_features)
+        New data, where n_samples in the number of samples
+        and n_features is the number of features.
+
+    Returns
+    -------
+    X_new : array, shape (n_samples, n_components_total)
+        Features of all models, the columns of each model following those of
+        the previous one.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from sklearn_extra.kernel_approximation import Fastfood, \\
+    ...     transform_many
+    >>> X = np.random.RandomState(0).random_sample((10, 5))
+    >>> models = [Fastfood(n_components=64, random_state=seed).fit(X)
+    ...           for seed in range(3)]
+    >>> transform_many(models, X).shape
+    (10, 384)
+    """
+    models = list(models)
+    if not models:
+        raise ValueError("transform_many requires at least one model")
+    first = models[0]
+    if any(model.n_features_in_ != first.n_features_in_
+           for model in models):
+        raise ValueError("All models must be fitted on data with the same "
+                         "number of features")
+    dtypes = set(model._check_output_dtype() for model in models)
+    if len(dtypes) > 1:
+        raise ValueError("All models must have the same output_dtype, got %s"
+                         % ', '.join(sorted(map(str, dtypes))))
+
+    X = check_array(X, dtype=np.float64)
+    first._check_n_features(X)
+    # P indexes the columns of its own model, shift it to the stacked ones
+    offsets = np.cumsum([0] + [model._n for model in models])
+    B = np.concatenate([model._B for model in models])
+    G = np.concatenate([model._G for model in models])
+    P = np.concatenate([model._P + offset
+                        for model, offset in zip(models, offsets)])
+    HGPHBX = first._apply_approximate_gaussian_matrix(B, G, P, X)
+    HGPHBX = HGPHBX.reshape((X.shape[0], -1))
+
+    widths = [2 * model._n if model.tradeoff_mem_accuracy == 'accuracy'
+              else model._n for model in models]
+    X_new = np.empty((X.shape[0], sum(widths)), dtype=dtypes.pop())
+    start = 0
+    for model, offset, width in zip(models, offsets, widths):
+        VX = model._scale_transformed_data(
+            model._S, HGPHBX[:, offset:offset + model._n])
+        model._phi(VX, out=X_new[:, start:start + width])
+        start += width
+    return X_new
+
+
+def _sample_fastfood_blocks(d, times_to_stack_v, tradeoff_mem_accuracy,
+                            random_state, sampling='mc'):
+    """Sample the random blocks G, B, P, S and U of the Fastfood feature map.
+
+    All blocks are drawn at once with methods shared by RandomState and
+    Generator.  Module level function so that it can be cached by
+    joblib.Memory.
+    """
+    rng = _check_random_state(random_state)
+    size = (times_to_stack_v, d)
+
+    if sampling == 'qmc':
+        G, radii = _sobol_gaussian_and_chi(size, rng)
+    elif sampling == 'orthogonal':
+        G = np.where(rng.uniform(size=size) < 0.5, -1., 1.)
+    else:
+        G = rng.normal(size=size)
+    B = np.where(rng.uniform(size=size) < 0.5, -1, 1)
+    # sorting uniform variates draws one random permutation per block
+    P = (np.argsort(rng.uniform(size=size), axis=1) +
+         d * np.arange(times_to_stack_v).reshape((-1, 1))).ravel()
+    if sampling != 'qmc':
+        # a chi variate is the square root of a chi-squared variate
+        radii = np.sqrt(rng.chisquare(d, size=size))
+    S = np.multiply(1 / Fastfood._l2norm_along_axis1(G).reshape((-1, 1)),
+                    radii)
+    if tradeoff_mem_accuracy != 'accuracy':
+        U = rng.uniform(0, 2 * np.pi, size=times_to_stack_v * d)
+    else:
+        U = None
+    return G, B, P, S, U
+
+
+def _sobol_gaussian_and_chi(size, rng):
+    """Gaussian and chi(size[1]) variates from a scrambled Sobol sequence.
+
+    Consecutive points are assigned to the same block, so that the values
+    of every block, whose length is a power of two, are stratified.
+    """
+    from scipy.stats import chi, norm, qmc
+
+    n_points = size[0] * size[1]
+    sobol = qmc.Sobol(d=2, scramble=True, seed=rng)
+    points = sobol.random_base2(int(np.ceil(np.log2(n_points))))[:n_points]
+    # keep the inverse CDFs finite
+    points = np.clip(points, np.finfo(np.float64).tiny,
+                     1 - np.finfo(np.float64).epsneg)
+    G = norm.ppf(points[:, 0]).reshape(size)
+    radii = chi.ppf(points[:, 1], size[1]).reshape(size)
+    return G, radii
+
+
+def _check_random_state(seed):
+    """check_random_state that also accepts a numpy.random.Generator."""
+    generator = getattr(np.random, 'Generator', None)
+    if generator is not None and isinstance(seed, generator):
+        return seed
+    return check_random_state(seed)
+
+
+def _transform_one(fastfood, key, X, misses):
+    """Module level function so that it can be cached by joblib.Memory.
+
+    key holds the parameters and fitted state of fastfood and replaces it in
+    the hash, so that the cache does not depend on the memory settings.
+    It only runs on a cache miss, which it records in the list misses of the
+    calling transform rather than on the shared fastfood.
+    """
+    misses.append(True)
+    return fastfood._transform(X)
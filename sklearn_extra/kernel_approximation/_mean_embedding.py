@@ -0,0 +1,239 @@
+# License: BSD 3 clause
+
+import numpy as np
+
+from sklearn.base import BaseEstimator
+from sklearn.utils import check_array, check_random_state, gen_batches
+
+from ._fastfood import Fastfood
+
+
+class FastfoodMeanEmbedding(BaseEstimator):
+    """Kernel mean embedding of a dataset in the Fastfood feature space.
+
+    The mean of the Fastfood features of a dataset represents the mean of the
+    RBF kernel functions centred on its samples: the kernel mean of a query
+    point, i.e. its unnormalised kernel density estimate, is the inner
+    product of its features with the mean, and the squared maximum mean
+    discrepancy (MMD) of two datasets is the squared distance of their means.
+    Both cost O(n_components log d) per point instead of O(n_samples).
+
+    The sum of the features is kept, so that embeddings are updated with
+    partial_fit, downdated with remove and merged with merge, e.g. to
+    maintain the embedding of a sliding window.  The storage is
+    O(n_components) whatever the number of samples.
+
+    Parameters
+    ----------
+    sigma : float
+        Parameter of RBF kernel: exp(-(1/(2*sigma^2)) * x^2)
+
+    n_components : int
+        Number of Monte Carlo samples per original feature of the Fastfood
+        feature map.
+
+    tradeoff_mem_accuracy : "accuracy" or "mem", default: 'accuracy'
+        Tradeoff of the Fastfood feature map, see Fastfood.
+
+    batch_size : int, default: 1024
+        Number of samples transformed at once.
+
+    random_state : {int, RandomState}, optional
+        If int, random_state is the seed used by the random number generator;
+        if RandomState instance, random_state is the random number generator.
+        Embeddings can only be compared and merged if they share the feature
+        map, e.g. are fitted with the same int seed.
+
+    Attributes
+    ----------
+    embedding_ : array, shape (n_features_new,)
+        Mean of the features of the samples seen.
+
+    n_samples_seen_ : int
+        Number of samples in the embedding.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from sklearn_extra.kernel_approximation import FastfoodMeanEmbedding
+    >>> rng = np.random.RandomState(0)
+    >>> reference = FastfoodMeanEmbedding(random_state=0).fit(
+    ...     rng.normal(size=(1000, 4)))
+    >>> drifted = rng.normal(loc=1., size=(1000, 4))
+    >>> reference.mmd2(drifted) > 10 * reference.mmd2(
+    ...     rng.normal(size=(1000, 4)))
+    True
+    """
+
+    def __init__(self,
+                 sigma=np.sqrt(1/2),
+                 n_components=100,
+                 tradeoff_mem_accuracy='accuracy',
+                 batch_size=1024,
+                 random_state=None):
+        self.sigma = sigma
+        self.n_components = n_components
+        self.tradeoff_mem_accuracy = tradeoff_mem_accuracy
+        self.batch_size = batch_size
+        self.random_state = random_state
+
+    def fit(self, X, y=None):
+        """Compute the mean embedding of X.
+
+        Parameters
+        ----------
+        X : {array-like}, shape (n_samples, n_features)
+            Data to embed, where n_samples in the number of samples
+            and n_features is the number of features.
+
+        Returns
+        -------
+        self : object
+            Returns the embedding.
+        """
+        X = check_array(X, dtype=np.float64)
+        self._fastfood = Fastfood(
+            sigma=self.sigma, n_components=self.n_components,
+            tradeoff_mem_accuracy=self.tradeoff_mem_accuracy,
+            random_state=check_random_state(self.random_state)).fit(X)
+        self._sum = self._sum_features(X)
+        self.n_samples_seen_ = X.shape[0]
+        self._update_embedding()
+        return self
+
+    def partial_fit(self, X, y=None):
+        """Add the samples of X to the embedding.
+
+        Parameters
+        ----------
+        X : {array-like}, shape (n_samples, n_features)
+            Data to add, where n_samples in the number of samples
+            and n_features is the number of features.
+
+        Returns
+        -------
+        self : object
+            Returns the embedding.
+        """
+        if not hasattr(self, '_fastfood'):
+            return self.fit(X)
+        X = check_array(X, dtype=np.float64)
+        self._sum += self._sum_features(X)
+        self.n_samples_seen_ += X.shape[0]
+        self._update_embedding()
+        return self
+
+    def remove(self, X):
+        """Remove the samples of X, which were added before, from the
+        embedding.
+
+        Parameters
+        ----------
+        X : {array-like}, shape (n_samples, n_features)
+            Data to remove, where n_samples in the number of samples
+            and n_features is the number of features.
+
+        Returns
+        -------
+        self : object
+            Returns the embedding.
+        """
+        X = check_array(X, dtype=np.float64)
+        if X.shape[0] > self.n_samples_seen_:
+            raise ValueError("Cannot remove %d samples from an embedding of "
+                             "%d samples" % (X.shape[0],
+                                             self.n_samples_seen_))
+        self._sum -= self._sum_features(X)
+        self.n_samples_seen_ -= X.shape[0]
+        self._update_embedding()
+        return self
+
+    def merge(self, other):
+        """Add the samples embedded by other to the embedding.
+
+        Parameters
+        ----------
+        other : FastfoodMeanEmbedding
+            Fitted embedding sharing the feature map.
+
+        Returns
+        -------
+        self : object
+            Returns the embedding.
+        """
+        self._check_same_feature_map(other)
+        self._sum += other._sum
+        self.n_samples_seen_ += other.n_samples_seen_
+        self._update_embedding()
+        return self
+
+    def _sum_features(self, X):
+        total = 0.
+        for batch in gen_batches(X.shape[0], self.batch_size):
+            total = total + self._fastfood.transform(X[batch]).sum(axis=0)
+        return total
+
+    def _update_embedding(self):
+        if self.n_samples_seen_ == 0:
+            self.embedding_ = np.zeros_like(self._sum)
+        else:
+            self.embedding_ = self._sum / self.n_samples_seen_
+
+    def _check_same_feature_map(self, other):
+        mine, theirs = self._fastfood, other._fastfood
+        same = ((mine.sigma, mine.tradeoff_mem_accuracy, mine._d, mine._n) ==
+                (theirs.sigma, theirs.tradeoff_mem_accuracy, theirs._d,
+                 theirs._n) and
+                all(np.array_equal(getattr(mine, name), getattr(theirs, name))
+                    for name in ('_B', '_G', '_P', '_S', '_U')))
+        if not same:
+            raise ValueError("The embeddings do not share their feature map, "
+                             "fit them with the same int random_state")
+
+    def kernel_mean(self, X):
+        """Approximate the mean of the RBF kernel between X and the embedded
+        samples.
+
+        This is the kernel density estimate of X, up to the normalisation
+        constant of the kernel.
+
+        Parameters
+        ----------
+        X : {array-like}, shape (n_samples, n_features)
+            Query points, where n_samples in the number of samples
+            and n_features is the number of features.
+
+        Returns
+        -------
+        kernel_mean : array, shape (n_samples,)
+        """
+        X = check_array(X, dtype=np.float64)
+        kernel_mean = np.empty(X.shape[0])
+        for batch in gen_batches(X.shape[0], self.batch_size):
+            kernel_mean[batch] = np.dot(self._fastfood.transform(X[batch]),
+                                        self.embedding_)
+        return kernel_mean
+
+    def mmd2(self, other):
+        """Approximate the squared maximum mean discrepancy to other samples.
+
+        Parameters
+        ----------
+        other : FastfoodMeanEmbedding or array-like, shape (n_samples, \
+n_features)
+            Embedding sharing the feature map, or samples to embed.
+
+        Returns
+        -------
+        mmd2 : float
+            Squared distance of the mean embeddings, the biased estimate of
+            the squared MMD.
+        """
+        if isinstance(other, FastfoodMeanEmbedding):
+            self._check_same_feature_map(other)
+            embedding = other.embedding_
+        else:
+            X = check_array(other, dtype=np.float64)
+            embedding = self._sum_features(X) / X.shape[0]
+        difference = self.embedding_ - embedding
+        return float(np.dot(difference, difference))
@@ -1,11 +1,14 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 import numpy as np
 
 from sklearn.utils.testing import assert_equal
 from sklearn.utils.testing import assert_array_almost_equal
 from sklearn.metrics.pairwise import rbf_kernel
+from scipy.linalg import hadamard
 
-from sklearn_extra.kernel_approximation import Fastfood
+from sklearn_extra.kernel_approximation import Fastfood, transform_many
 
 
 # generate data
@@ -51,6 +54,343 @@ def test_fastfood():
     print('true kernel:', kernel[:5, :5])
     assert_array_almost_equal(kernel, kernel_approx, decimal=1)
 
+
+@pytest.mark.parametrize('tradeoff_mem_accuracy', ['accuracy', 'mem'])
+def test_fastfood_transform_multi_sigma(tradeoff_mem_accuracy):
+    """test that sharing the projection matches one Fastfood per sigma"""
+    sigmas = [0.1, 0.5, 2.]
+    ff_transform = Fastfood(n_components=128,
+                            tradeoff_mem_accuracy=tradeoff_mem_accuracy,
+                            random_state=42).fit(X)
+    X_multi = ff_transform.transform_multi_sigma(X, sigmas)
+
+    assert_equal(len(sigmas), len(X_multi))
+    for sigma, X_trans in zip(sigmas, X_multi):
+        expected = Fastfood(sigma, n_components=128,
+                            tradeoff_mem_accuracy=tradeoff_mem_accuracy,
+                            random_state=42).fit(X).transform(X)
+        assert_array_almost_equal(expected, X_trans)
+
+
+def test_fastfood_memory(tmpdir, monkeypatch):
+    """test that transformed data is reused across refits with the same seed"""
+    calls = []
+    transform = Fastfood._transform
+
+    def counting_transform(self, X):
+        calls.append(X.shape)
+        return transform(self, X)
+
+    monkeypatch.setattr(Fastfood, '_transform', counting_transform)
+
+    ff_transform = Fastfood(n_components=64, random_state=42,
+                            memory=str(tmpdir))
+    X_trans = ff_transform.fit(X).transform(X)
+    X_trans_cached = ff_transform.fit(X).transform(X)
+    assert_equal(1, len(calls))
+    assert_array_almost_equal(X_trans, X_trans_cached)
+
+    ff_transform.transform(Y)
+    assert_equal(2, len(calls))
+
+    ff_transform.set_params(sigma=2.).fit(X).transform(X)
+    assert_equal(3, len(calls))
+
+
+def test_fastfood_cache_bytes_limit(tmpdir):
+    """test that the cache directory is bounded by cache_bytes_limit"""
+    ff_transform = Fastfood(n_components=64, random_state=42,
+                            memory=str(tmpdir), cache_bytes_limit=1)
+    ff_transform.fit(X).transform(X)
+    cached_outputs = [f for f in tmpdir.visit() if f.basename == 'output.pkl']
+    assert_equal([], cached_outputs)
+
+
+def test_fastfood_cache_reduced_on_miss_only(tmpdir, monkeypatch):
+    """test that the cache directory is only bounded when it grows"""
+    reductions = []
+    monkeypatch.setattr(Fastfood, '_reduce_cache_size',
+                        lambda self, memory: reductions.append(memory))
+    ff_transform = Fastfood(n_components=64, random_state=42,
+                            memory=str(tmpdir), cache_bytes_limit=10 ** 9)
+    ff_transform.fit(X)
+    n_reductions = len(reductions)
+    state = set(vars(ff_transform))
+    X_trans = ff_transform.transform(X)
+    assert_equal(n_reductions + 1, len(reductions))
+    assert_array_almost_equal(X_trans, ff_transform.transform(X))
+    assert_equal(n_reductions + 1, len(reductions))
+    assert_equal(state, set(vars(ff_transform)))
+
+
+def test_fastfood_cache_misses_of_concurrent_transforms(tmpdir, monkeypatch):
+    """test that concurrent transforms each bound the cache on their miss"""
+    reductions = []
+    monkeypatch.setattr(Fastfood, '_reduce_cache_size',
+                        lambda self, memory: reductions.append(memory))
+    ff_transform = Fastfood(n_components=64, memory=str(tmpdir),
+                            cache_bytes_limit=10 ** 9).fit(X)
+    n_reductions = len(reductions)
+    batches = [X + i for i in range(16)]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(ff_transform.transform, batches))
+    assert_equal(n_reductions + 16, len(reductions))
+    for batch, X_trans in zip(batches, results):
+        assert_array_almost_equal(ff_transform._transform(batch), X_trans)
+
+
+def test_fastfood_fit_from_n_features():
+    """test that fit only depends on the number of features of X"""
+    ff_transform = Fastfood(n_components=1000, random_state=42).fit(X)
+    ff_shape_only = Fastfood(n_components=1000,
+                             random_state=42).fit_from_n_features(50)
+    for attr in ['_B', '_G', '_P', '_S']:
+        assert_array_almost_equal(getattr(ff_transform, attr),
+                                  getattr(ff_shape_only, attr))
+    assert_array_almost_equal(ff_transform.transform(Y),
+                              ff_shape_only.transform(Y))
+
+
+def test_fastfood_sampled_blocks():
+    """test that P holds one permutation per block and B random signs"""
+    ff_transform = Fastfood(n_components=1000, random_state=42).fit(X)
+    d = ff_transform._d
+    blocks = ff_transform._P.reshape(-1, d)
+    expected = np.arange(blocks.shape[0]).reshape(-1, 1) * d + np.arange(d)
+    assert_array_almost_equal(expected, np.sort(blocks, axis=1))
+    assert set(np.unique(ff_transform._B)) == {-1, 1}
+
+
+@pytest.mark.skipif(not hasattr(np.random, 'default_rng'),
+                    reason='numpy.random.Generator is not available')
+def test_fastfood_generator():
+    """test that a numpy.random.Generator can be used as random_state"""
+    gamma = 10.
+    kernel = rbf_kernel(X, Y, gamma=gamma)
+    ff_transform = Fastfood(np.sqrt(1 / (2 * gamma)), n_components=1000,
+                            random_state=np.random.default_rng(42))
+    X_trans = ff_transform.fit_transform(X)
+    Y_trans = ff_transform.transform(Y)
+    assert_array_almost_equal(kernel, np.dot(X_trans, Y_trans.T), decimal=1)
+
+
+def test_fastfood_fortran_ordered_input():
+    """test that the memory layout of X does not change the features"""
+    ff_transform = Fastfood(n_components=128, random_state=42).fit(X)
+    assert_array_almost_equal(ff_transform.transform(X),
+                              ff_transform.transform(np.asfortranarray(X)))
+
+    X_64 = rng.random_sample(size=(300, 64))
+    ff_transform = Fastfood(n_components=128, random_state=42).fit(X_64)
+    assert_array_almost_equal(ff_transform.transform(X_64),
+                              ff_transform.transform(X_64.T.copy().T))
+
+
+@pytest.mark.parametrize('tradeoff_mem_accuracy', ['accuracy', 'mem'])
+@pytest.mark.parametrize('output_dtype, decimal',
+                         [(np.float32, 6), (np.float16, 3),
+                          (np.int8, 3), (np.int16, 5)])
+def test_fastfood_output_dtype(tradeoff_mem_accuracy, output_dtype, decimal):
+    """test that reduced precision features approximate float64 features"""
+    params = dict(n_components=128, random_state=42,
+                  tradeoff_mem_accuracy=tradeoff_mem_accuracy)
+    X_trans = Fastfood(**params).fit(X).transform(X)
+
+    ff_transform = Fastfood(output_dtype=output_dtype, **params).fit(X)
+    X_reduced = ff_transform.transform(X)
+    assert_equal(np.dtype(output_dtype), X_reduced.dtype)
+    assert_equal(X_trans.shape, X_reduced.shape)
+
+    X_dequantized = ff_transform.dequantize(X_reduced)
+    assert_equal(np.float64, X_dequantized.dtype)
+    assert_array_almost_equal(X_trans, X_dequantized, decimal=decimal)
+
+
+def test_fastfood_int8_uses_full_range():
+    """test that int8 features span the full range of the type"""
+    ff_transform = Fastfood(n_components=128, random_state=42,
+                            output_dtype='int8').fit(X)
+    X_quantized = ff_transform.transform(X)
+    assert_equal(127, np.abs(X_quantized).max())
+
+
+def test_fastfood_invalid_output_dtype():
+    with pytest.raises(ValueError, match='output_dtype'):
+        Fastfood(output_dtype=np.int64).fit(X)
+    ff_transform = Fastfood().fit(X).set_params(output_dtype=np.int64)
+    with pytest.raises(ValueError, match='output_dtype'):
+        ff_transform.transform(X)
+
+
+def _has_scipy_qmc():
+    try:
+        from scipy.stats import qmc  # noqa
+    except ImportError:
+        return False
+    return True
+
+
+@pytest.mark.parametrize(
+    'sampling',
+    ['mc', 'orthogonal',
+     pytest.param('qmc', marks=pytest.mark.skipif(
+         not _has_scipy_qmc(), reason='scipy.stats.qmc is not available'))])
+def test_fastfood_sampling(sampling):
+    """test that all sampling schemes approximate the kernel"""
+    gamma = 10.
+    kernel = rbf_kernel(X, Y, gamma=gamma)
+    ff_transform = Fastfood(np.sqrt(1 / (2 * gamma)), n_components=1000,
+                            sampling=sampling, random_state=42)
+    X_trans = ff_transform.fit_transform(X)
+    Y_trans = ff_transform.transform(Y)
+    assert_array_almost_equal(kernel, np.dot(X_trans, Y_trans.T), decimal=1)
+
+
+def test_fastfood_orthogonal_blocks():
+    """test that the rows of every block of the projection are orthogonal"""
+    ff_transform = Fastfood(n_components=128, sampling='orthogonal',
+                            random_state=42).fit(X)
+    d = ff_transform._d
+    projection = ff_transform._apply_approximate_gaussian_matrix(
+        ff_transform._B, ff_transform._G, ff_transform._P, np.eye(d))
+    for block in np.split(projection.reshape(d, -1), 128 // d, axis=1):
+        assert_array_almost_equal(d ** 2 * np.eye(d), np.dot(block.T, block))
+
+
+def test_fastfood_orthogonal_reduces_error():
+    """test that orthogonal blocks approximate the kernel more accurately"""
+    gamma = 10.
+    kernel = rbf_kernel(X, Y, gamma=gamma)
+    errors = {}
+    for sampling in ['mc', 'orthogonal']:
+        errors[sampling] = 0
+        for seed in range(5):
+            ff_transform = Fastfood(np.sqrt(1 / (2 * gamma)),
+                                    n_components=256, sampling=sampling,
+                                    random_state=seed).fit(X)
+            kernel_approx = np.dot(ff_transform.transform(X),
+                                   ff_transform.transform(Y).T)
+            errors[sampling] += np.mean((kernel - kernel_approx) ** 2)
+    assert errors['orthogonal'] < errors['mc']
+
+
+@pytest.mark.skipif(not _has_scipy_qmc(),
+                    reason='scipy.stats.qmc is not available')
+def test_fastfood_qmc_stratifies_blocks():
+    """test that every block of G holds as many negative as positive values"""
+    ff_transform = Fastfood(n_components=1000, sampling='qmc',
+                            random_state=42).fit(X)
+    d = ff_transform._d
+    assert_array_almost_equal(np.full(ff_transform._times_to_stack_v, d / 2),
+                              np.sum(ff_transform._G < 0, axis=1))
+
+
+def test_fastfood_invalid_sampling():
+    with pytest.raises(ValueError, match='sampling'):
+        Fastfood(sampling='sobol').fit(X)
+
+
+def test_fastfood_auto_tune_kernel_error():
+    """test that auto_tune picks the smallest size meeting the error target"""
+    gamma = 10.
+    kernel = rbf_kernel(X, gamma=gamma)
+
+    def kernel_error(ff_transform):
+        X_trans = ff_transform.transform(X)
+        return np.sqrt(np.mean((np.dot(X_trans, X_trans.T) - kernel) ** 2))
+
+    ff_transform = Fastfood(np.sqrt(1 / (2 * gamma)), random_state=42)
+    ff_transform.auto_tune(X, target_kernel_error=0.01)
+    n_components = ff_transform.n_components
+    assert Fastfood._is_number_power_of_two(n_components)
+    assert kernel_error(ff_transform) <= 0.01
+    assert_equal((300, 2 * n_components), ff_transform.transform(X).shape)
+
+    smaller = ff_transform._truncated(ff_transform._times_to_stack_v // 2)
+    assert kernel_error(smaller) > 0.01
+
+
+def test_fastfood_auto_tune_latency():
+    """test that auto_tune stays within the latency budget"""
+    ff_transform = Fastfood(random_state=42)
+    ff_transform.auto_tune(X, max_latency_ms=1e9, max_n_components=256)
+    assert_equal(256, ff_transform.n_components)
+
+    with pytest.raises(ValueError, match='budget'):
+        ff_transform.auto_tune(X, max_latency_ms=0)
+
+
+def test_fastfood_auto_tune_without_budget():
+    with pytest.raises(ValueError, match='target_kernel_error'):
+        Fastfood().auto_tune(X)
+
+
+@pytest.mark.parametrize("n_samples", [3, 100])
+def test_fastfood_pruned_fht_matches_dense_hadamard(n_samples):
+    """test the features of unpadded X against dense Hadamard matrices"""
+    # 300 features are padded to d=512, transformed by the pruned FHT
+    X_wide = rng.random_sample(size=(n_samples, 300))
+    ff_transform = Fastfood(n_components=1024, random_state=0).fit(X_wide)
+    d, n = ff_transform._d, ff_transform._n
+    H = hadamard(d)
+    X_padded = np.hstack([X_wide, np.zeros((n_samples, d - 300))])
+    HBX = np.hstack([np.dot(X_padded * B, H) for B in ff_transform._B])
+    GPHBX = HBX[:, ff_transform._P] * ff_transform._G.ravel()
+    VX = np.hstack([np.dot(GPHBX[:, start:start + d], H)
+                    for start in range(0, n, d)])
+    VX *= ff_transform._S.ravel() / (ff_transform.sigma * np.sqrt(d))
+    expected = np.hstack([np.cos(VX), np.sin(VX)]) / np.sqrt(n)
+    assert_array_almost_equal(expected, ff_transform.transform(X_wide),
+                              decimal=10)
+
+
+def test_fastfood_wrong_number_of_features():
+    """test that data of another number of features than fitted is rejected"""
+    X_10 = rng.random_sample(size=(5, 10))
+    ff_transform = Fastfood(n_components=64, random_state=0).fit(X_10)
+    assert_equal(10, ff_transform.n_features_in_)
+    for n_features in [8, 16]:
+        X_other = rng.random_sample(size=(5, n_features))
+        with pytest.raises(ValueError, match='features'):
+            ff_transform.transform(X_other)
+        with pytest.raises(ValueError, match='features'):
+            ff_transform.transform_multi_sigma(X_other, [1.])
+        with pytest.raises(ValueError, match='features'):
+            transform_many([ff_transform], X_other)
+
+
+def test_transform_many():
+    models = [Fastfood(n_components=64, random_state=0).fit(X),
+              Fastfood(sigma=.5, n_components=200, random_state=1).fit(X),
+              Fastfood(n_components=128, tradeoff_mem_accuracy='mem',
+                       random_state=2).fit(X)]
+    X_new = transform_many(models, Y)
+    assert_array_almost_equal(
+        X_new, np.hstack([model.transform(Y) for model in models]),
+        decimal=12)
+
+
+def test_transform_many_quantised():
+    models = [Fastfood(n_components=64, output_dtype=np.int8,
+                       random_state=seed).fit(X) for seed in range(2)]
+    X_new = transform_many(models, Y)
+    assert_equal(X_new.dtype, np.int8)
+    np.testing.assert_array_equal(
+        X_new, np.hstack([model.transform(Y) for model in models]))
+
+
+def test_transform_many_incompatible_models():
+    with pytest.raises(ValueError, match='number of features'):
+        transform_many([Fastfood(random_state=0).fit(X),
+                        Fastfood(random_state=0).fit(X[:, :10])], X)
+    with pytest.raises(ValueError, match='output_dtype'):
+        transform_many([Fastfood(random_state=0).fit(X),
+                        Fastfood(output_dtype=np.float32,
+                                 random_state=0).fit(X)], X)
+    with pytest.raises(ValueError, match='at least one'):
+        transform_many([], X)
+
+
 # def test_fastfood_mem_or_accuracy():
 #     """compares the performance of Fastfood and RKS"""
 #     #generate data
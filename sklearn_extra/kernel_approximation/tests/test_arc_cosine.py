@@ -0,0 +1,59 @@
+import pytest
+import numpy as np
+import numpy.testing as npt
+
+from sklearn_extra.kernel_approximation import FastfoodArcCosine
+
+
+rng = np.random.RandomState(0)
+X = rng.normal(size=(20, 16))
+
+
+def arc_cosine_kernel(X, Y, order):
+    norms_X = np.linalg.norm(X, axis=1)
+    norms_Y = np.linalg.norm(Y, axis=1)
+    cosine = np.dot(X, Y.T) / np.outer(norms_X, norms_Y)
+    theta = np.arccos(np.clip(cosine, -1., 1.))
+    if order == 0:
+        J = np.pi - theta
+    elif order == 1:
+        J = np.sin(theta) + (np.pi - theta) * np.cos(theta)
+    else:
+        J = (3 * np.sin(theta) * np.cos(theta) +
+             (np.pi - theta) * (1 + 2 * np.cos(theta) ** 2))
+    return np.outer(norms_X, norms_Y) ** order * J / np.pi
+
+
+@pytest.mark.parametrize("order", [0, 1, 2])
+def test_arc_cosine_approximates_kernel(order):
+    kernel = arc_cosine_kernel(X, X, order)
+    arc_cosine = FastfoodArcCosine(order=order, n_components=16384,
+                                   random_state=0)
+    X_new = arc_cosine.fit_transform(X)
+    assert X_new.shape == (20, 16384)
+    # relative to the typical value of the kernel, which is |x|^2n
+    scale = np.mean(np.diag(kernel))
+    npt.assert_allclose(np.dot(X_new, X_new.T) / scale, kernel / scale,
+                        atol=0.05 * (order + 1))
+
+
+def test_arc_cosine_activations():
+    X_new = {order: FastfoodArcCosine(order=order, n_components=64,
+                                      random_state=0).fit_transform(X)
+             for order in (0, 1, 2)}
+    assert set(np.unique(X_new[0])) == {0., np.sqrt(2. / 64)}
+    assert np.all(X_new[1] >= 0)
+    active = X_new[0] > 0
+    npt.assert_array_equal(X_new[1] > 0, active)
+    npt.assert_allclose(X_new[2], X_new[1] ** 2 * np.sqrt(64 / 2.))
+
+
+def test_arc_cosine_invalid_order():
+    with pytest.raises(ValueError, match='order'):
+        FastfoodArcCosine(order=3).fit(X)
+
+
+def test_arc_cosine_wrong_number_of_features():
+    arc_cosine = FastfoodArcCosine(n_components=64, random_state=0).fit(X)
+    with pytest.raises(ValueError, match='features'):
+        arc_cosine.transform(X[:, :10])
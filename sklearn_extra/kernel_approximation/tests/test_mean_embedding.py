@@ -0,0 +1,71 @@
+import pytest
+import numpy as np
+import numpy.testing as npt
+
+from sklearn.metrics.pairwise import rbf_kernel
+
+from sklearn_extra.kernel_approximation import FastfoodMeanEmbedding
+
+
+rng = np.random.RandomState(0)
+X = rng.normal(size=(400, 8))
+Y = rng.normal(loc=.5, size=(300, 8))
+sigma = 2.
+gamma = 1 / (2 * sigma ** 2)
+
+
+def test_mean_embedding_kernel_mean():
+    embedding = FastfoodMeanEmbedding(sigma=sigma, n_components=2048,
+                                      random_state=0).fit(X)
+    npt.assert_allclose(embedding.kernel_mean(Y[:20]),
+                        rbf_kernel(Y[:20], X, gamma=gamma).mean(axis=1),
+                        atol=0.02)
+    assert embedding.n_samples_seen_ == X.shape[0]
+
+
+def test_mean_embedding_mmd2():
+    embedding = FastfoodMeanEmbedding(sigma=sigma, n_components=2048,
+                                      random_state=0)
+    other = FastfoodMeanEmbedding(sigma=sigma, n_components=2048,
+                                  random_state=0).fit(Y)
+    mmd2 = (rbf_kernel(X, gamma=gamma).mean() +
+            rbf_kernel(Y, gamma=gamma).mean() -
+            2 * rbf_kernel(X, Y, gamma=gamma).mean())
+    assert embedding.fit(X).mmd2(other) == pytest.approx(mmd2, abs=5e-3)
+    assert embedding.mmd2(other) == pytest.approx(embedding.mmd2(Y))
+    assert embedding.mmd2(X) == pytest.approx(0., abs=1e-12)
+
+
+def test_mean_embedding_streaming_and_merge():
+    embedding = FastfoodMeanEmbedding(random_state=0, batch_size=64).fit(X)
+    streamed = FastfoodMeanEmbedding(random_state=0)
+    for batch in np.array_split(X, 5):
+        streamed.partial_fit(batch)
+    npt.assert_allclose(streamed.embedding_, embedding.embedding_)
+
+    merged = FastfoodMeanEmbedding(random_state=0).fit(X[:100])
+    merged.merge(FastfoodMeanEmbedding(random_state=0).fit(X[100:]))
+    npt.assert_allclose(merged.embedding_, embedding.embedding_)
+    assert merged.n_samples_seen_ == X.shape[0]
+
+    # sliding window: add the new samples, remove the oldest ones
+    window = FastfoodMeanEmbedding(random_state=0).fit(X[:200])
+    window.partial_fit(X[200:]).remove(X[:200])
+    npt.assert_allclose(
+        window.embedding_,
+        FastfoodMeanEmbedding(random_state=0).fit(X[200:]).embedding_)
+
+
+def test_mean_embedding_different_feature_maps():
+    embedding = FastfoodMeanEmbedding(random_state=0).fit(X)
+    other = FastfoodMeanEmbedding(random_state=1).fit(X)
+    with pytest.raises(ValueError, match='feature map'):
+        embedding.merge(other)
+    with pytest.raises(ValueError, match='feature map'):
+        embedding.mmd2(other)
+
+
+def test_mean_embedding_remove_too_many():
+    embedding = FastfoodMeanEmbedding(random_state=0).fit(X[:10])
+    with pytest.raises(ValueError, match='Cannot remove'):
+        embedding.remove(X)
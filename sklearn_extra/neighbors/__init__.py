@@ -0,0 +1,4 @@
+from ._lsh import FastfoodLSHIndex
+
+
+__all__ = ['FastfoodLSHIndex']
@@ -0,0 +1,279 @@
+# License: BSD 3 clause
+
+import numpy as np
+
+from sklearn.base import BaseEstimator
+from sklearn.utils import check_array, gen_batches
+
+from ..kernel_approximation import Fastfood
+
+
+# number of samples hashed at once, which bounds the memory of the projections
+_BATCH_SIZE = 1024
+
+# bits of smallest projection of each table flipped by the probes, which
+# fixes the order of the probes whatever their number
+_N_FLIPPED_BITS = 8
+
+
+def _key_dtype(n_bits):
+    """ Smallest unsigned integer type holding keys of n_bits bits """
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if n_bits <= np.iinfo(dtype).bits:
+            return dtype
+    return np.uint64
+
+
+class FastfoodLSHIndex(BaseEstimator):
+    """Approximate nearest neighbors search with Fastfood based SimHash.
+
+    Each sample is hashed by the signs of a structured pseudo-Gaussian random
+    projection HGPHB x, the same projection Fastfood uses to approximate the
+    RBF kernel.  Hashing a sample hence costs O(n_tables * n_bits log d)
+    instead of O(n_tables * n_bits * d) for a dense Gaussian projection.  The
+    hashes are split into n_tables keys of n_bits bits, which are stored as
+    bit-packed integers of the smallest unsigned type in sorted tables.
+    Queries gather the samples sharing a key with them in any table, and the
+    samples next to them in the sorted tables if too few samples collide.
+    They also probe the buckets whose keys differ in the bits of smallest
+    projection, i.e. the most likely to be flipped for a close sample.  All
+    the candidates are ranked by their exact euclidean distance.
+
+    Parameters
+    ----------
+    n_neighbors : int, default: 5
+        Number of neighbors to use by default for kneighbors queries.
+
+    n_bits : int, default: 16
+        Number of bits of each hash key, at most 64.  Longer keys give smaller
+        buckets, i.e. fewer but closer candidates per table.
+
+    n_tables : int, default: 8
+        Number of hash tables.  More tables increase the probability to find
+        the true neighbors at the cost of more candidates to rank.
+
+    n_candidates : int, default: 50
+        Minimal number of candidates ranked by their exact distance for each
+        query.  Must be at least n_neighbors.
+
+    n_probes : int, default: 32
+        Number of buckets probed for each query, over all tables, in addition
+        to the buckets of its own keys.  The keys of the probed buckets only
+        differ in the 8 bits of smallest projection of each table.  More
+        probes find more of the true neighbors at the cost of more candidates
+        to rank.
+
+    random_state : {int, RandomState}, optional
+        If int, random_state is the seed used by the random number generator;
+        if RandomState instance, random_state is the random number generator.
+
+    Notes
+    -----
+    See "Similarity Estimation Techniques from Rounding Algorithms" by
+    Moses Charikar for the SimHash family of locality sensitive hash
+    functions, and "Multi-Probe LSH: Efficient Indexing for High-Dimensional
+    Similarity Search" by Qin Lv et al. for the probing of nearby buckets.
+
+    """
+
+    def __init__(self,
+                 n_neighbors=5,
+                 n_bits=16,
+                 n_tables=8,
+                 n_candidates=50,
+                 n_probes=32,
+                 random_state=None):
+        self.n_neighbors = n_neighbors
+        self.n_bits = n_bits
+        self.n_tables = n_tables
+        self.n_candidates = n_candidates
+        self.n_probes = n_probes
+        self.random_state = random_state
+
+    def _project(self, X):
+        """ Projections of the bits, shape (n_samples, n_tables, n_bits) """
+        ff = self._fastfood
+        projection = ff._apply_approximate_gaussian_matrix(
+            ff._B, ff._G, ff._P, X - self._mean)
+        n_hash_bits = self.n_tables * self.n_bits
+        return projection.reshape(X.shape[0], -1)[:, :n_hash_bits].reshape(
+            X.shape[0], self.n_tables, self.n_bits)
+
+    def _keys(self, projection):
+        """ Bit-packed hash keys, shape (n_samples, n_tables) """
+        dtype = self._sorted_hashes.dtype.type
+        keys = np.zeros(projection.shape[:2], dtype=dtype)
+        for bit in range(self.n_bits):
+            keys |= (projection[:, :, bit] > 0).astype(dtype) << dtype(bit)
+        return keys
+
+    def fit(self, X, y=None):
+        """Hash X and build the hash tables.
+
+        Parameters
+        ----------
+        X : {array-like}, shape (n_samples, n_features)
+            Training data, where n_samples in the number of samples
+            and n_features is the number of features.
+
+        Returns
+        -------
+        self : object
+            Returns the index.
+        """
+        if not 1 <= self.n_bits <= 64:
+            raise ValueError("n_bits must be between 1 and 64, got %r"
+                             % self.n_bits)
+        if self.n_candidates < self.n_neighbors:
+            raise ValueError("n_candidates must be at least n_neighbors, got "
+                             "n_candidates=%r and n_neighbors=%r"
+                             % (self.n_candidates, self.n_neighbors))
+        if self.n_probes < 0:
+            raise ValueError("n_probes must be non-negative, got %r"
+                             % self.n_probes)
+        X = check_array(X, dtype=np.float64)
+        n_samples = X.shape[0]
+
+        self._fit_X = X
+        self._mean = X.mean(axis=0)
+        self._fastfood = Fastfood(n_components=self.n_tables * self.n_bits,
+                                  random_state=self.random_state).fit(X)
+        # the tables are rows, so that each of them is contiguous
+        self._sorted_hashes = np.empty((self.n_tables, n_samples),
+                                       dtype=_key_dtype(self.n_bits))
+        for batch in gen_batches(n_samples, _BATCH_SIZE):
+            self._sorted_hashes[:, batch] = self._keys(
+                self._project(X[batch])).T
+        if n_samples <= np.iinfo(np.uint32).max:
+            index_dtype = np.uint32
+        else:
+            index_dtype = np.intp
+        self._order = np.empty((self.n_tables, n_samples), dtype=index_dtype)
+        for keys, order in zip(self._sorted_hashes, self._order):
+            order[:] = np.argsort(keys, kind='mergesort')
+            keys[:] = keys[order]
+        return self
+
+    def _probes(self, projection):
+        """ Tables and keys of the buckets probed by each query
+
+        The buckets of the keys of the queries come first, followed by the
+        n_probes buckets of smallest sum of the absolute projections of the
+        bits in which their keys differ.  Only the bits of smallest projection
+        of each table are flipped, so that the buckets probed with fewer
+        probes are always among those probed with more.
+        """
+        keys = self._keys(projection)
+        tables = np.broadcast_to(np.arange(self.n_tables), keys.shape)
+        if self.n_probes == 0:
+            return tables, keys
+
+        n_flips = min(self.n_bits, _N_FLIPPED_BITS)
+        rows = np.arange(keys.shape[0])[:, np.newaxis]
+        margins = np.abs(projection)
+        flipped = np.argsort(margins, axis=2)[:, :, :n_flips]
+        # all non-empty subsets of the flipped bits, shape (n_subsets, n_flips)
+        subsets = (np.arange(1, 2 ** n_flips)[:, np.newaxis] >>
+                   np.arange(n_flips)) & 1
+        flipped_margins = margins[rows[:, :, np.newaxis],
+                                  np.arange(self.n_tables)[:, np.newaxis],
+                                  flipped]
+        scores = np.dot(flipped_margins, subsets.T).reshape(keys.shape[0], -1)
+        masks = np.dot(np.left_shift(np.uint64(1), flipped.astype(np.uint64)),
+                       subsets.T.astype(np.uint64)).reshape(keys.shape[0], -1)
+        if self.n_probes < scores.shape[1]:
+            best = np.argpartition(scores, self.n_probes - 1,
+                                   axis=1)[:, :self.n_probes]
+        else:
+            best = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+        probe_tables = best // subsets.shape[0]
+        probe_keys = keys[rows, probe_tables] ^ masks[rows, best].astype(
+            keys.dtype)
+        return (np.hstack([tables, probe_tables]),
+                np.hstack([keys, probe_keys]))
+
+    def _candidates(self, tables, left, right, n_candidates):
+        left_keys, right_keys = left[:self.n_tables], right[:self.n_tables]
+        candidates = np.unique(np.concatenate(
+            [self._order[t, l:r]
+             for t, (l, r) in enumerate(zip(left_keys, right_keys))]))
+
+        # widen the buckets of the keys of the query to the neighboring keys
+        # in the sorted tables, which is bounded by n_candidates per table
+        width = n_candidates - candidates.shape[0]
+        while width > 0 and candidates.shape[0] < n_candidates:
+            candidates = np.union1d(candidates, np.concatenate(
+                [self._order[t, max(l - width, 0):r + width]
+                 for t, (l, r) in enumerate(zip(left_keys, right_keys))]))
+            width *= 2
+
+        # the probed buckets only add candidates, so that more probes cannot
+        # miss neighbors found with fewer
+        if len(tables) > self.n_tables:
+            candidates = np.union1d(candidates, np.concatenate(
+                [self._order[t, l:r] for t, l, r in zip(
+                    tables[self.n_tables:], left[self.n_tables:],
+                    right[self.n_tables:])]))
+        return candidates
+
+    def kneighbors(self, X, n_neighbors=None, return_distance=True):
+        """Find the approximate K-neighbors of each point in X.
+
+        Parameters
+        ----------
+        X : {array-like}, shape (n_queries, n_features)
+            The query points.
+
+        n_neighbors : int, optional
+            Number of neighbors to get, by default the value passed to the
+            constructor.
+
+        return_distance : boolean, default: True
+            If False, distances will not be returned.
+
+        Returns
+        -------
+        dist : array, shape (n_queries, n_neighbors)
+            Euclidean distances to the neighbors, only present if
+            return_distance=True.
+
+        ind : array, shape (n_queries, n_neighbors)
+            Indices of the nearest points in the training data.
+        """
+        if n_neighbors is None:
+            n_neighbors = self.n_neighbors
+        n_samples_fit = self._fit_X.shape[0]
+        if n_neighbors > n_samples_fit:
+            raise ValueError("Expected n_neighbors <= n_samples, but "
+                             "n_samples = %d, n_neighbors = %d"
+                             % (n_samples_fit, n_neighbors))
+        X = check_array(X, dtype=np.float64)
+        self._fastfood._check_n_features(X)
+        n_candidates = min(max(self.n_candidates, n_neighbors), n_samples_fit)
+
+        dist = np.empty((X.shape[0], n_neighbors))
+        ind = np.empty((X.shape[0], n_neighbors), dtype=np.intp)
+        for batch in gen_batches(X.shape[0], _BATCH_SIZE):
+            tables, keys = self._probes(self._project(X[batch]))
+            left = np.empty(keys.shape, dtype=np.intp)
+            right = np.empty(keys.shape, dtype=np.intp)
+            for t, sorted_hashes in enumerate(self._sorted_hashes):
+                probed = tables == t
+                left[probed] = np.searchsorted(sorted_hashes, keys[probed],
+                                               side='left')
+                right[probed] = np.searchsorted(sorted_hashes, keys[probed],
+                                                side='right')
+
+            for j, i in enumerate(range(batch.start, batch.stop)):
+                candidates = self._candidates(tables[j], left[j], right[j],
+                                              n_candidates)
+                diff = self._fit_X[candidates] - X[i]
+                candidate_dist = np.sqrt(np.einsum('ij,ij->i', diff, diff))
+                nearest = np.argsort(candidate_dist,
+                                     kind='mergesort')[:n_neighbors]
+                dist[i] = candidate_dist[nearest]
+                ind[i] = candidates[nearest]
+
+        if return_distance:
+            return dist, ind
+        return ind
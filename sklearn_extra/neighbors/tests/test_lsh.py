@@ -0,0 +1,111 @@
+import pytest
+import numpy as np
+import numpy.testing as npt
+
+from sklearn.neighbors import NearestNeighbors
+
+from sklearn_extra.neighbors import FastfoodLSHIndex
+
+
+rng = np.random.RandomState(0)
+centers = 5 * rng.normal(size=(20, 30))
+X = centers[rng.randint(20, size=2000)] + rng.normal(size=(2000, 30))
+Y = centers[rng.randint(20, size=50)] + rng.normal(size=(50, 30))
+
+
+def test_kneighbors_recall():
+    index = FastfoodLSHIndex(n_neighbors=5, random_state=0).fit(X)
+    dist, ind = index.kneighbors(Y)
+    assert dist.shape == (50, 5)
+    assert ind.shape == (50, 5)
+    npt.assert_array_almost_equal(
+        np.sqrt(((X[ind] - Y[:, np.newaxis]) ** 2).sum(axis=2)), dist)
+    assert np.all(np.diff(dist, axis=1) >= 0)
+
+    exact = NearestNeighbors(n_neighbors=5).fit(X).kneighbors(
+        Y, return_distance=False)
+    recall = np.mean([len(set(a) & set(b)) for a, b in zip(ind, exact)]) / 5
+    assert recall > 0.8
+
+
+def test_kneighbors_training_points():
+    index = FastfoodLSHIndex(random_state=0).fit(X)
+    ind = index.kneighbors(X[:10], n_neighbors=1, return_distance=False)
+    npt.assert_array_equal(np.arange(10), ind.ravel())
+
+
+@pytest.mark.parametrize("n_probes", [0, 32])
+def test_kneighbors_small_buckets_widen_to_sorted_keys(n_probes):
+    index = FastfoodLSHIndex(n_bits=64, n_tables=1, n_candidates=10,
+                             n_probes=n_probes, random_state=0).fit(X)
+    dist, ind = index.kneighbors(Y, n_neighbors=10)
+    assert np.all(np.isfinite(dist))
+    assert all(len(np.unique(row)) == 10 for row in ind)
+
+
+@pytest.mark.parametrize("n_bits, dtype",
+                         [(8, np.uint8), (16, np.uint16), (17, np.uint32),
+                          (64, np.uint64)])
+def test_hash_tables(n_bits, dtype):
+    # X has more samples than are hashed at once
+    index = FastfoodLSHIndex(n_bits=n_bits, n_tables=3, random_state=0).fit(X)
+    assert index._sorted_hashes.dtype == dtype
+    assert index._sorted_hashes.shape == (3, X.shape[0])
+    keys = index._keys(index._project(X))
+    for t in range(3):
+        npt.assert_array_equal(index._sorted_hashes[t],
+                               keys[index._order[t], t])
+        assert np.all(np.diff(index._sorted_hashes[t]) >= 0)
+
+
+def test_probes_flip_bits_of_smallest_projection():
+    index = FastfoodLSHIndex(n_bits=16, n_tables=2, n_probes=5,
+                             random_state=0).fit(X)
+    projection = index._project(Y)
+    tables, keys = index._probes(projection)
+    assert tables.shape == keys.shape == (50, 7)
+    npt.assert_array_equal(tables[:, :2], np.tile([0, 1], (50, 1)))
+    npt.assert_array_equal(keys[:, :2], index._keys(projection))
+    # the bit of smallest projection of all tables is flipped alone
+    closest = np.argmin(np.abs(projection).reshape(50, -1), axis=1)
+    flipped = keys[:, 2:] ^ keys[np.arange(50)[:, np.newaxis], tables[:, 2:]]
+    single = (tables[:, 2:] == (closest // 16)[:, np.newaxis]) & (
+        flipped == np.left_shift(1, closest % 16)[:, np.newaxis])
+    assert np.all(single.sum(axis=1) == 1)
+
+
+def test_recall_does_not_drop_with_more_probes():
+    exact = NearestNeighbors(n_neighbors=5).fit(X).kneighbors(
+        Y, return_distance=False)
+    recalls = []
+    for n_probes in [0, 4, 32, 256]:
+        index = FastfoodLSHIndex(n_bits=24, n_probes=n_probes,
+                                 random_state=0).fit(X)
+        ind = index.kneighbors(Y, return_distance=False)
+        recalls.append(np.mean([len(set(a) & set(b))
+                                for a, b in zip(ind, exact)]) / 5)
+    assert np.all(np.diff(recalls) >= 0)
+    assert recalls[-1] > recalls[0]
+
+
+@pytest.mark.parametrize(
+    "params, message",
+    [({'n_bits': 65}, 'n_bits'),
+     ({'n_bits': 0}, 'n_bits'),
+     ({'n_neighbors': 10, 'n_candidates': 5}, 'n_candidates'),
+     ({'n_probes': -1}, 'n_probes')])
+def test_invalid_parameters(params, message):
+    with pytest.raises(ValueError, match=message):
+        FastfoodLSHIndex(**params).fit(X)
+
+
+def test_too_many_neighbors():
+    index = FastfoodLSHIndex(random_state=0).fit(X[:3])
+    with pytest.raises(ValueError, match='n_neighbors'):
+        index.kneighbors(Y, n_neighbors=4)
+
+
+def test_kneighbors_wrong_number_of_features():
+    index = FastfoodLSHIndex(random_state=0).fit(X)
+    with pytest.raises(ValueError, match='features'):
+        index.kneighbors(Y[:, :20])
@@ -0,0 +1,4 @@
+from ._srht import SubsampledRandomizedHadamardProjection
+
+
+__all__ = ['SubsampledRandomizedHadamardProjection']
@@ -0,0 +1,122 @@
+# License: BSD 3 clause
+
+import numpy as np
+
+from sklearn.base import BaseEstimator
+from sklearn.base import TransformerMixin
+from sklearn.utils import check_array, check_random_state
+
+from ..utils._fht_dispatch import fht2 as cyfht
+
+
+class SubsampledRandomizedHadamardProjection(BaseEstimator,
+                                             TransformerMixin):
+    """Reduce dimensionality through a subsampled randomized Hadamard
+    transform (SRHT).
+
+    The SRHT is a fast Johnson-Lindenstrauss transform: the features of each
+    sample are zero padded to the next power of two d, multiplied by random
+    signs D, mixed by the Walsh-Hadamard transformation H and finally
+    n_components of the mixed coordinates are subsampled and rescaled.  The
+    computational complexity for mapping a single example is O(d log d)
+    instead of O(n_components * d) for a dense Gaussian or sparse random
+    projection.  The space complexity is O(d).
+
+    Parameters
+    ----------
+    n_components : int
+        Dimensionality of the target projection space.  Must not exceed the
+        number of features padded to the next power of two.
+
+    batch_size : int, optional
+        Number of samples transformed at once.  Bounds the memory of the
+        zero padded intermediate buffer to batch_size * d values.  By
+        default, all samples are transformed at once.
+
+    random_state : {int, RandomState}, optional
+        If int, random_state is the seed used by the random number generator;
+        if RandomState instance, random_state is the random number generator.
+
+    Notes
+    -----
+    float32 input is transformed in float32, any other input in float64.
+
+    See "Improved analysis of the subsampled randomized Hadamard transform"
+    by Joel A. Tropp.
+
+    """
+
+    def __init__(self,
+                 n_components=100,
+                 batch_size=None,
+                 random_state=None):
+        self.n_components = n_components
+        self.batch_size = batch_size
+        self.random_state = random_state
+
+    def fit(self, X, y=None):
+        """Fit the model with X.
+
+        Samples the random signs and the subsampled coordinates.
+
+        Parameters
+        ----------
+        X : {array-like}, shape (n_samples, n_features)
+            Training data, where n_samples in the number of samples
+            and n_features is the number of features.
+
+        Returns
+        -------
+        self : object
+            Returns the transformer.
+        """
+        X = check_array(X, dtype=[np.float64, np.float32])
+
+        rng = check_random_state(self.random_state)
+        self._d_orig = X.shape[1]
+        self._d = int(2 ** np.ceil(np.log2(max(self._d_orig, 2))))
+        if not 0 < self.n_components <= self._d:
+            raise ValueError("n_components must be between 1 and the number "
+                             "of features padded to a power of two (%d), "
+                             "got %r" % (self._d, self.n_components))
+
+        self._D = rng.choice([-1, 1], size=self._d_orig, replace=True)
+        self._indices = np.sort(rng.choice(self._d, size=self.n_components,
+                                           replace=False))
+        return self
+
+    def transform(self, X):
+        """Project X onto the reduced space.
+
+        Parameters
+        ----------
+        X : {array-like}, shape (n_samples, n_features)
+            New data, where n_samples in the number of samples
+            and n_features is the number of features.
+
+        Returns
+        -------
+        X_new : array, shape (n_samples, n_components)
+        """
+        X = check_array(X, dtype=[np.float64, np.float32])
+        if X.shape[1] != self._d_orig:
+            raise ValueError("X has %d features per sample; expecting %d"
+                             % (X.shape[1], self._d_orig))
+
+        n_samples = X.shape[0]
+        batch_size = self.batch_size or max(n_samples, 1)
+        D = self._D.astype(X.dtype)
+        scale = X.dtype.type(1 / np.sqrt(self.n_components))
+
+        X_new = np.empty((n_samples, self.n_components), dtype=X.dtype)
+        buffer = np.empty((min(batch_size, n_samples), self._d),
+                          dtype=X.dtype)
+        for start in range(0, n_samples, batch_size):
+            stop = min(start + batch_size, n_samples)
+            batch = buffer[:stop - start]
+            np.multiply(X[start:stop], D, out=batch[:, :self._d_orig])
+            batch[:, self._d_orig:] = 0
+            cyfht(batch)
+            np.multiply(batch[:, self._indices], scale,
+                        out=X_new[start:stop])
+        return X_new
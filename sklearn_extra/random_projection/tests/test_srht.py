@@ -0,0 +1,61 @@
+import pytest
+import numpy as np
+import numpy.testing as npt
+from scipy.linalg import hadamard
+
+from sklearn.metrics.pairwise import euclidean_distances
+
+from sklearn_extra.random_projection import \
+    SubsampledRandomizedHadamardProjection
+
+
+rng = np.random.RandomState(0)
+X = rng.normal(size=(100, 300))
+
+
+def test_srht_matches_dense_definition():
+    srht = SubsampledRandomizedHadamardProjection(n_components=64,
+                                                  random_state=0).fit(X)
+    X_padded = np.hstack([X * srht._D, np.zeros((100, 512 - 300))])
+    expected = np.dot(X_padded, hadamard(512))[:, srht._indices] / 8.
+    npt.assert_array_almost_equal(expected, srht.transform(X))
+
+
+def test_srht_preserves_distances():
+    srht = SubsampledRandomizedHadamardProjection(n_components=256,
+                                                  random_state=0)
+    X_new = srht.fit_transform(X)
+    assert X_new.shape == (100, 256)
+
+    distances = euclidean_distances(X)[np.triu_indices(100, 1)]
+    distances_new = euclidean_distances(X_new)[np.triu_indices(100, 1)]
+    npt.assert_array_less(np.abs(distances_new / distances - 1), 0.3)
+
+
+@pytest.mark.parametrize('batch_size', [1, 7, 100, 1000])
+def test_srht_batch_size(batch_size):
+    srht = SubsampledRandomizedHadamardProjection(n_components=64,
+                                                  random_state=0).fit(X)
+    expected = srht.transform(X)
+    X_new = srht.set_params(batch_size=batch_size).transform(X)
+    npt.assert_array_almost_equal(expected, X_new)
+
+
+def test_srht_float32():
+    srht = SubsampledRandomizedHadamardProjection(n_components=64,
+                                                  random_state=0).fit(X)
+    X_new = srht.transform(X.astype(np.float32))
+    assert X_new.dtype == np.float32
+    npt.assert_array_almost_equal(srht.transform(X), X_new, decimal=4)
+
+
+def test_srht_invalid_n_components():
+    srht = SubsampledRandomizedHadamardProjection(n_components=513)
+    with pytest.raises(ValueError, match='n_components'):
+        srht.fit(X)
+
+
+def test_srht_wrong_number_of_features():
+    srht = SubsampledRandomizedHadamardProjection(n_components=64).fit(X)
+    with pytest.raises(ValueError, match='features'):
+        srht.transform(X[:, :10])
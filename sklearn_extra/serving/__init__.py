@@ -0,0 +1,5 @@
+from ._batching import BatchingTransformer
+from ._shared import SharedModelHandle, SharedModelStore
+
+
+__all__ = ['BatchingTransformer', 'SharedModelHandle', 'SharedModelStore']
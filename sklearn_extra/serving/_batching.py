@@ -0,0 +1,157 @@
+# License: BSD 3 clause
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import numpy as np
+
+from sklearn.utils import check_array
+
+
+class BatchingTransformer(object):
+    """Batch concurrent asyncio transform requests to a fitted transformer.
+
+    Requests of a few rows each, as served by a web service, waste the batch
+    efficiency of transformers such as Fastfood.  The coroutine transform
+    queues the rows of every request.  The queue is transformed as a single
+    batch as soon as it holds max_batch_size rows, or max_wait_ms after the
+    first request was queued, on a thread pool so that the event loop keeps
+    serving.  Every request gets its own rows of the result back.
+
+    Fastfood releases the GIL in its Hadamard transformations, so that
+    batches run in parallel on several worker threads.
+
+    Parameters
+    ----------
+    transformer : fitted transformer
+        Transformer whose transform method is applied to the batches.
+
+    max_batch_size : int, default: 256
+        Number of queued rows which triggers a batch right away.
+
+    max_wait_ms : float, default: 2.
+        Longest time in milliseconds a request waits for others to join its
+        batch.
+
+    executor : concurrent.futures.Executor, optional
+        Executor running the batches.  By default, a ThreadPoolExecutor with
+        n_workers threads is created and shut down by close.
+
+    n_workers : int, default: 1
+        Number of threads of the default executor.
+
+    Examples
+    --------
+    >>> import asyncio
+    >>> import numpy as np
+    >>> from sklearn_extra.kernel_approximation import Fastfood
+    >>> from sklearn_extra.serving import BatchingTransformer
+    >>> fastfood = Fastfood(n_components=64, random_state=0).fit(
+    ...     np.zeros((1, 8)))
+    >>> async def serve(rows):
+    ...     with BatchingTransformer(fastfood) as batching:
+    ...         return await asyncio.gather(
+    ...             *[batching.transform(row) for row in rows])
+    >>> results = asyncio.new_event_loop().run_until_complete(
+    ...     serve(np.ones((10, 1, 8))))
+    >>> len(results), results[0].shape
+    (10, (1, 128))
+    """
+
+    def __init__(self, transformer, max_batch_size=256, max_wait_ms=2.,
+                 executor=None, n_workers=1):
+        self.transformer = transformer
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.n_workers = n_workers
+        self._own_executor = executor is None
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=n_workers)
+        self._executor = executor
+        self._pending = []
+        self._n_pending_rows = 0
+        self._timer = None
+
+    async def transform(self, X):
+        """Transform X as part of a batch.
+
+        Parameters
+        ----------
+        X : {array-like}, shape (n_samples, n_features)
+            Rows of a single request.
+
+        Returns
+        -------
+        X_new : array, shape (n_samples, n_components)
+            The rows of the transformed batch belonging to X.
+        """
+        X = check_array(X, dtype=np.float64)
+        if self._pending and X.shape[1] != self._pending[0][0].shape[1]:
+            raise ValueError("X has %d features, but the queued requests "
+                             "have %d features"
+                             % (X.shape[1], self._pending[0][0].shape[1]))
+        # Python < 3.7 has no get_running_loop, there get_event_loop returns
+        # the running loop inside a coroutine
+        loop = getattr(asyncio, 'get_running_loop', asyncio.get_event_loop)()
+        future = loop.create_future()
+        self._pending.append((X, future))
+        self._n_pending_rows += X.shape[0]
+        if self._n_pending_rows >= self.max_batch_size:
+            self._flush(loop)
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000,
+                                          self._flush, loop)
+        return await future
+
+    def _flush(self, loop):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        self._n_pending_rows = 0
+        if not pending:
+            return
+        # the flush may run from the timer, where an exception would be
+        # lost and leave the requests waiting forever
+        try:
+            batch = np.concatenate([X for X, _ in pending])
+            work = loop.run_in_executor(self._executor,
+                                        self.transformer.transform, batch)
+        except Exception as exception:
+            self._fail(pending, exception)
+            return
+        work.add_done_callback(partial(self._scatter, pending))
+
+    @staticmethod
+    def _fail(pending, exception):
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(exception)
+
+    @classmethod
+    def _scatter(cls, pending, work):
+        """ Hand every request its rows of the transformed batch """
+        try:
+            X_new = work.result()
+        except Exception as exception:
+            cls._fail(pending, exception)
+            return
+        start = 0
+        for X, future in pending:
+            stop = start + X.shape[0]
+            if not future.done():
+                future.set_result(X_new[start:stop])
+            start = stop
+
+    def close(self):
+        """Shut down the default executor once the running batches are done.
+        """
+        if self._own_executor:
+            self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,244 @@
+# License: BSD 3 clause
+
+import os
+import sys
+
+import numpy as np
+
+# offsets of the arrays are aligned to cache lines
+_ALIGNMENT = 64
+
+
+def _open_segment(name):
+    """ Open an existing segment without registering it for cleanup """
+    # multiprocessing.shared_memory is only available from Python 3.8
+    from multiprocessing import resource_tracker, shared_memory
+
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name, track=False)
+
+    # The processes share the resource tracker of the owner, which removes
+    # the segment when the owner exits.  Registering it once more, or
+    # unregistering it after the fact, would drop the registration of the
+    # owner, so the registration of this segment is skipped instead.
+    register = resource_tracker.register
+
+    def skip_segment(resource, rtype):
+        if rtype != 'shared_memory' or resource.lstrip('/') != name:
+            register(resource, rtype)
+
+    resource_tracker.register = skip_segment
+    try:
+        return shared_memory.SharedMemory(name)
+    finally:
+        resource_tracker.register = register
+
+
+class _Segment(object):
+    """ Array interface of a shared memory segment, which keeps it mapped
+
+    numpy does not hold the buffer of the memoryview of a segment, whose
+    close would unmap the arrays viewing it.  Being the base of those arrays
+    instead, the segment is only closed when the last of them is released.
+    """
+
+    def __init__(self, shm):
+        self._shm = shm
+        address = np.frombuffer(shm.buf, dtype=np.uint8).ctypes.data
+        self.__array_interface__ = {'shape': (shm.size,), 'typestr': '|u1',
+                                    'data': (address, False), 'version': 3}
+
+
+class SharedModelHandle(object):
+    """Picklable description of the models published by a SharedModelStore.
+
+    The handle holds the name of the shared memory segment or the path of the
+    file, the parameters and scalar attributes of every model and the
+    offset, dtype and shape of each of their array attributes.  It is cheap
+    to pickle, whatever the size of the arrays.
+    """
+
+    def __init__(self, name, path, size, layout):
+        self.name = name
+        self.path = path
+        self.size = size
+        self.layout = layout
+
+
+class SharedModelStore(object):
+    """Share the arrays of fitted models between worker processes.
+
+    Every process of a worker pool which unpickles its own copy of the
+    fitted models multiplies their memory by the number of workers.  The
+    store instead copies all array attributes of the models, such as the
+    _B, _G, _P, _S and _U blocks of Fastfood, once into a single shared
+    memory segment, or into a file if path is given.  Workers attach to the
+    store through its handle and get models whose arrays are read-only views
+    of the segment: attaching copies no array and only costs the unpickling
+    of the handle.
+
+    The process creating the store owns the segment, closing the owning
+    store or leaving its context removes the name of the segment, so that no
+    store can attach to it anymore.  The models handed out by a store remain
+    valid after its close: the mapping is released with the last of their
+    arrays.
+
+    Parameters
+    ----------
+    models : dict or sequence of fitted estimators
+        Models to publish, keyed by the keys of the dict or by the positions
+        in the sequence.  All attributes which are numpy arrays are shared,
+        the other attributes are pickled with the handle.
+
+    path : str, optional
+        File to publish the arrays into, which is then memory-mapped by the
+        workers.  By default, an anonymous shared memory segment is created,
+        which requires Python 3.8 or later.
+
+    Attributes
+    ----------
+    handle : SharedModelHandle
+        Picklable handle to pass to the workers.
+
+    Examples
+    --------
+    >>> import pickle
+    >>> import numpy as np
+    >>> from sklearn_extra.kernel_approximation import Fastfood
+    >>> from sklearn_extra.serving import SharedModelStore
+    >>> X = np.ones((2, 8))
+    >>> fastfood = Fastfood(n_components=64, random_state=0).fit(X)
+    >>> with SharedModelStore({'model': fastfood}) as store:
+    ...     payload = pickle.dumps(store.handle)  # sent to the workers
+    ...     with SharedModelStore.attach(pickle.loads(payload)) as attached:
+    ...         np.allclose(attached['model'].transform(X),
+    ...                     fastfood.transform(X))
+    True
+    """
+
+    def __init__(self, models, path=None):
+        if not hasattr(models, 'items'):
+            models = dict(enumerate(models))
+        layout = []
+        arrays = []
+        size = 0
+        for key, model in models.items():
+            state = {}
+            entries = []
+            for attribute, value in vars(model).items():
+                if not isinstance(value, np.ndarray):
+                    state[attribute] = value
+                    continue
+                if value.dtype.hasobject:
+                    raise ValueError('Cannot share the object array %s of '
+                                     'model %r' % (attribute, key))
+                size = -(-size // _ALIGNMENT) * _ALIGNMENT
+                entries.append((attribute, size, value.dtype.str,
+                                value.shape))
+                arrays.append((size, value))
+                size += value.nbytes
+            layout.append((key, type(model), state, entries))
+        # neither segments nor maps may be empty
+        size = max(size, 1)
+
+        if path is None:
+            from multiprocessing import shared_memory
+            shm = shared_memory.SharedMemory(create=True, size=size)
+            buffer = shm.buf
+            name = shm.name
+        else:
+            shm = None
+            buffer = np.memmap(path, dtype=np.uint8, mode='w+', shape=size)
+            name = None
+        for offset, value in arrays:
+            np.ndarray(value.shape, value.dtype, buffer=buffer,
+                       offset=offset)[...] = value
+        if shm is None:
+            buffer.flush()
+        del buffer
+
+        self.handle = SharedModelHandle(name, path, size, layout)
+        self._owner = True
+        self._shm = shm
+        self._models = None
+        self._map()
+
+    @classmethod
+    def attach(cls, handle):
+        """Attach to the models published through handle.
+
+        Parameters
+        ----------
+        handle : SharedModelHandle
+            Handle of the owning store, usually unpickled in a worker.
+
+        Returns
+        -------
+        store : SharedModelStore
+            Store handing out read-only models which share the arrays of the
+            owning store.
+        """
+        store = cls.__new__(cls)
+        store.handle = handle
+        store._owner = False
+        store._shm = None
+        if handle.path is None:
+            store._shm = _open_segment(handle.name)
+        store._models = None
+        store._map()
+        return store
+
+    def _map(self):
+        if self._shm is not None:
+            buffer = np.asarray(_Segment(self._shm))
+        else:
+            buffer = np.memmap(self.handle.path, dtype=np.uint8, mode='r',
+                               shape=self.handle.size)
+        models = {}
+        for key, model_class, state, entries in self.handle.layout:
+            model = model_class.__new__(model_class)
+            model.__dict__.update(state)
+            for attribute, offset, dtype, shape in entries:
+                array = np.ndarray(shape, dtype, buffer=buffer,
+                                   offset=offset)
+                array.flags.writeable = False
+                setattr(model, attribute, array)
+            models[key] = model
+        self._models = models
+
+    def __getitem__(self, key):
+        if self._models is None:
+            raise ValueError('The store is closed')
+        return self._models[key]
+
+    def __len__(self):
+        return len(self.handle.layout)
+
+    def keys(self):
+        """Keys of the published models."""
+        return [key for key, _, _, _ in self.handle.layout]
+
+    def close(self):
+        """Release the models, and remove the segment if owning it.
+
+        The mapping itself is released with the last array of the models
+        handed out by the store.
+        """
+        self._models = None
+        if self._shm is not None:
+            if self._owner:
+                self._shm.unlink()
+            self._shm = None
+        elif self._owner and os.path.exists(self.handle.path):
+            os.remove(self.handle.path)
+        self._owner = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __reduce__(self):
+        # pickled stores attach to the segment rather than copy it
+        return SharedModelStore.attach, (self.handle,)
@@ -0,0 +1,6 @@
+import sys
+
+
+# multiprocessing.shared_memory is only available from Python 3.8
+if sys.version_info < (3, 8):
+    collect_ignore = ['_shared.py', 'tests/test_shared.py']
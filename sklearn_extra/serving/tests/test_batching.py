@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+import numpy as np
+import numpy.testing as npt
+
+from sklearn_extra.kernel_approximation import Fastfood
+from sklearn_extra.serving import BatchingTransformer
+
+
+rng = np.random.RandomState(0)
+X = rng.random_sample(size=(100, 20))
+fastfood = Fastfood(n_components=64, random_state=0).fit(X)
+
+
+class CountingTransformer(object):
+    def __init__(self, transformer):
+        self.transformer = transformer
+        self.batch_sizes = []
+
+    def transform(self, X):
+        self.batch_sizes.append(X.shape[0])
+        return self.transformer.transform(X)
+
+
+class FailingTransformer(object):
+    def transform(self, X):
+        raise RuntimeError('transform failed')
+
+
+def _run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+async def _transform_all(batching, requests):
+    return await asyncio.gather(*[batching.transform(request)
+                                  for request in requests])
+
+
+def test_results_match_transform():
+    requests = np.array_split(X, 40)
+    with BatchingTransformer(fastfood, max_batch_size=16) as batching:
+        results = _run(_transform_all(batching, requests))
+    for request, result in zip(requests, results):
+        npt.assert_array_almost_equal(fastfood.transform(request), result)
+
+
+def test_requests_are_batched():
+    counting = CountingTransformer(fastfood)
+    requests = np.array_split(X, 50)
+    with BatchingTransformer(counting, max_batch_size=20) as batching:
+        _run(_transform_all(batching, requests))
+    assert sum(counting.batch_sizes) == 100
+    assert counting.batch_sizes == [20] * 5
+
+
+def test_partial_batch_is_flushed_after_max_wait():
+    counting = CountingTransformer(fastfood)
+    with BatchingTransformer(counting, max_batch_size=1000,
+                             max_wait_ms=1.) as batching:
+        results = _run(_transform_all(batching, np.array_split(X[:6], 3)))
+    assert counting.batch_sizes == [6]
+    assert [result.shape for result in results] == [(2, 128)] * 3
+
+
+def test_errors_are_propagated_to_all_requests():
+    with BatchingTransformer(FailingTransformer()) as batching:
+        with pytest.raises(RuntimeError, match='transform failed'):
+            _run(_transform_all(batching, np.array_split(X[:4], 4)))
+
+
+async def _transform_all_or_fail(batching, requests):
+    # a request left pending would hang the test
+    return await asyncio.wait_for(asyncio.gather(
+        *[batching.transform(request) for request in requests],
+        return_exceptions=True), timeout=5.)
+
+
+def test_mixed_number_of_features():
+    with BatchingTransformer(fastfood, max_batch_size=1000) as batching:
+        results = _run(_transform_all_or_fail(batching,
+                                              [X[:2], X[2:4, :5], X[4:6]]))
+    npt.assert_array_almost_equal(results[0], fastfood.transform(X[:2]))
+    assert isinstance(results[1], ValueError)
+    assert 'features' in str(results[1])
+    npt.assert_array_almost_equal(results[2], fastfood.transform(X[4:6]))
+
+
+def test_flush_errors_are_propagated_to_all_requests():
+    batching = BatchingTransformer(fastfood, max_batch_size=1000)
+    batching.close()
+    results = _run(_transform_all_or_fail(batching, np.array_split(X[:4], 2)))
+    assert all(isinstance(result, RuntimeError) for result in results)
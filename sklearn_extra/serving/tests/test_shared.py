@@ -0,0 +1,151 @@
+import multiprocessing
+import os
+import pickle
+import subprocess
+import sys
+from multiprocessing import shared_memory
+
+import pytest
+import numpy as np
+import numpy.testing as npt
+
+from sklearn_extra.kernel_approximation import Fastfood
+from sklearn_extra.serving import SharedModelStore
+
+
+rng = np.random.RandomState(0)
+X = rng.random_sample(size=(30, 20))
+models = {
+    'accuracy': Fastfood(n_components=64, random_state=0).fit(X),
+    'mem': Fastfood(n_components=128, tradeoff_mem_accuracy='mem',
+                    random_state=1).fit(X),
+}
+
+
+def _transform_attached(handle, key):
+    with SharedModelStore.attach(handle) as store:
+        return store[key].transform(X)
+
+
+def test_shared_model_store_transform():
+    with SharedModelStore(models) as store:
+        assert len(store) == 2
+        assert sorted(store.keys()) == ['accuracy', 'mem']
+        attached = SharedModelStore.attach(pickle.loads(
+            pickle.dumps(store.handle)))
+        for key, model in models.items():
+            npt.assert_allclose(attached[key].transform(X),
+                                model.transform(X))
+            assert attached[key].get_params() == model.get_params()
+        attached.close()
+
+
+def test_shared_model_store_read_only_views():
+    with SharedModelStore(models) as store:
+        attached = SharedModelStore.attach(store.handle)
+        for name in ('_B', '_G', '_P', '_S'):
+            first = getattr(store['accuracy'], name)
+            second = getattr(attached['accuracy'], name)
+            assert not second.flags.writeable
+            npt.assert_array_equal(second, getattr(models['accuracy'], name))
+            assert not np.shares_memory(
+                first, getattr(models['accuracy'], name))
+        assert attached['accuracy']._U is None
+        with pytest.raises(ValueError):
+            attached['accuracy']._G[0] = 0.
+        attached.close()
+
+
+def test_shared_model_store_sequence_and_pickle():
+    with SharedModelStore(list(models.values())) as store:
+        assert store.keys() == [0, 1]
+        attached = pickle.loads(pickle.dumps(store))
+        npt.assert_allclose(attached[1].transform(X),
+                            models['mem'].transform(X))
+        attached.close()
+
+
+def test_shared_model_store_close_unlinks():
+    store = SharedModelStore(models)
+    name = store.handle.name
+    store.close()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name)
+    with pytest.raises(ValueError, match='closed'):
+        store['mem']
+
+
+def test_shared_model_store_models_outlive_close():
+    with SharedModelStore(models) as store:
+        owned = store['accuracy']
+        with SharedModelStore.attach(store.handle) as attached:
+            model = attached['mem']
+    del store, attached
+    # the arrays keep the mapping of the segment alive
+    npt.assert_allclose(owned.transform(X), models['accuracy'].transform(X))
+    npt.assert_allclose(model.transform(X), models['mem'].transform(X))
+
+
+def test_shared_model_store_path(tmpdir):
+    path = os.path.join(str(tmpdir), 'models.bin')
+    with SharedModelStore(models, path=path) as store:
+        assert store.handle.name is None
+        attached = SharedModelStore.attach(store.handle)
+        npt.assert_allclose(attached['accuracy'].transform(X),
+                            models['accuracy'].transform(X))
+        assert not attached['accuracy']._B.flags.writeable
+        attached.close()
+        assert os.path.exists(path)
+    assert not os.path.exists(path)
+
+
+def test_shared_model_store_worker_process():
+    context = multiprocessing.get_context('spawn')
+    with SharedModelStore(models) as store:
+        with context.Pool(1) as pool:
+            X_new = pool.apply(_transform_attached, (store.handle, 'mem'))
+        # the exiting worker leaves the segment to its owner
+        npt.assert_allclose(store['mem'].transform(X), X_new)
+        npt.assert_allclose(X_new, models['mem'].transform(X))
+
+
+_FORK_SCRIPT = """
+import multiprocessing
+import numpy as np
+from sklearn_extra.kernel_approximation import Fastfood
+from sklearn_extra.serving import SharedModelStore
+
+X = np.ones((4, 8))
+
+
+def work(handle):
+    with SharedModelStore.attach(handle) as store:
+        return store['model'].transform(X).sum()
+
+
+fastfood = Fastfood(n_components=64, random_state=0).fit(X)
+with SharedModelStore({'model': fastfood}) as store:
+    with SharedModelStore.attach(store.handle) as attached:
+        attached['model'].transform(X)
+    with multiprocessing.get_context('fork').Pool(2) as pool:
+        pool.map(work, [store.handle] * 4)
+"""
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(),
+                    reason='requires the fork start method')
+def test_shared_model_store_fork_leaves_registration_to_owner():
+    # attached stores in the owner and in forked workers share the resource
+    # tracker of the owner, which must still know the segment at its unlink
+    result = subprocess.run([sys.executable, '-c', _FORK_SCRIPT],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            universal_newlines=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stderr == ''
+
+
+def test_shared_model_store_object_array():
+    fastfood = Fastfood(random_state=0).fit(X)
+    fastfood._extra = np.array([None])
+    with pytest.raises(ValueError, match='object array'):
+        SharedModelStore([fastfood])
@@ -2,12 +2,20 @@ import pytest
 
 from sklearn.utils.estimator_checks import check_estimator
 
-from sklearn_extra.kernel_approximation import Fastfood
+from sklearn_extra.cluster import FastfoodKernelKMeans
+from sklearn_extra.decomposition import FastfoodKernelPCA
+from sklearn_extra.kernel_approximation import Fastfood, FastfoodArcCosine, \
+    FastfoodMeanEmbedding
+from sklearn_extra.neighbors import FastfoodLSHIndex
+from sklearn_extra.random_projection import \
+    SubsampledRandomizedHadamardProjection
 
 
 @pytest.mark.parametrize(
     "Estimator",
-    [Fastfood]
+    [Fastfood, FastfoodArcCosine, FastfoodKernelKMeans, FastfoodKernelPCA,
+     FastfoodLSHIndex, FastfoodMeanEmbedding,
+     SubsampledRandomizedHadamardProjection]
 )
 def test_all_estimators(Estimator, request):
     return check_estimator(Estimator)
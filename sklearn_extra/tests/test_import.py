@@ -0,0 +1,42 @@
+import subprocess
+import sys
+
+import pytest
+
+# -X importtime and the lazy submodules need Python 3.7
+requires_python37 = pytest.mark.skipif(sys.version_info < (3, 7),
+                                       reason='requires Python 3.7')
+
+
+def _run(code):
+    return subprocess.check_output([sys.executable, '-X', 'importtime',
+                                    '-c', code],
+                                   stderr=subprocess.STDOUT).decode()
+
+
+@requires_python37
+def test_import_does_not_load_submodules():
+    output = _run('import sys; before = set(sys.modules); '
+                  'import sklearn_extra; '
+                  'print(" ".join(set(sys.modules) - before))')
+    imported = output.strip().splitlines()[-1].split()
+    assert sorted(name for name in imported
+                  if name.split('.')[0] in ('sklearn_extra', 'sklearn',
+                                            'scipy', 'numpy')) == \
+        ['sklearn_extra', 'sklearn_extra._version']
+
+
+@requires_python37
+def test_import_time_budget():
+    output = _run('import sklearn_extra')
+    # lines are "import time: self [us] | cumulative | imported package"
+    cumulative = [int(line.split('|')[1]) for line in output.splitlines()
+                  if line.split('|')[-1].strip() == 'sklearn_extra']
+    assert len(cumulative) == 1
+    assert cumulative[0] < 100000
+
+
+def test_submodules_are_loaded_on_access():
+    output = _run('import sklearn_extra; print(sklearn_extra.'
+                  'kernel_approximation.Fastfood.__name__)')
+    assert output.strip().splitlines()[-1] == 'Fastfood'
@@ -0,0 +1,4 @@
+from ._fht import fht
+
+
+__all__ = ['fht']
@@ -6,7 +6,12 @@ https://en.wikipedia.org/wiki/Hadamard_transform
 
 This module supplies a single dimensional and two-dimensional row-wise
 implementation. Both are non-normalized, operate in-place and can only handle
-the double/float64 type.
+the double/float64 type. The two-dimensional transformation is also available
+with rows interleaved in blocks, which is faster for short rows.
+
+The kernels are compiled with the default flags of the compiler. The same
+kernels are compiled for specific instruction sets into sibling modules,
+_fht_dispatch.py selects the fastest one supported by the CPU.
 
 Inspired by a Python-C-API implementation at:
 
@@ -20,11 +25,7 @@ cimport numpy as np
 cimport cython
 from libc.math cimport log2
 
-def is_power_of_two(input_integer):
-    """ Test if an integer is a power of two. """
-    if input_integer == 1:
-        return False
-    return input_integer != 0 and ((input_integer & (input_integer - 1)) == 0)
+include "_fht_kernels.pxi"
 
 
 def pure_python_fht(array_):
@@ -40,41 +41,57 @@ def pure_python_fht(array_):
                 array_[j] = temp - array_[j]
 
 
-def fht(cython.floating[::1] array_):
-    """ Single dimensional FHT. """
-    if not is_power_of_two(array_.shape[0]):
-        raise ValueError('Length of input for fht must be a power of two')
-    else:
-        _fht(array_)
-
-
-@cython.boundscheck(False)
-cdef void _fht(cython.floating[::1] array_) nogil:
-    cdef unsigned int bit, length, _, i, j
-    cdef cython.floating temp
-    bit = length = array_.shape[0]
-    for _ in xrange(<unsigned int>(log2(length))):
-        bit >>= 1
-        for i in xrange(length):
-            if i & bit == 0:
-                j = i | bit
-                temp = array_[i]
-                array_[i] += array_[j]
-                array_[j] = temp - array_[j]
-
-def fht2(cython.floating[:, ::1] array_):
-    """ Two dimensional row-wise FHT. """
-    if not is_power_of_two(array_.shape[1]):
-        raise ValueError('Length of rows for fht2 must be a power of two')
-    else:
-        _fht2(array_)
-
-
-@cython.boundscheck(False)
-cdef void _fht2(cython.floating[:, ::1] array_) nogil:
-    cdef unsigned int n
-    n = array_.shape[0]
-    for x in xrange(n):
-        # TODO: This call still shows up as yellow in cython -a presumably due
-        # to the [] access, but the array_ is already typed...
-        _fht(array_[x])
+cdef extern from *:
+    """
+    #if (defined(__GNUC__) || defined(__clang__)) && \\
+        (defined(__x86_64__) || defined(__i386__))
+    static int sklearn_extra_cpu_supports_avx2(void) {
+        __builtin_cpu_init();
+        return __builtin_cpu_supports("avx2") && __builtin_cpu_supports("fma");
+    }
+    static int sklearn_extra_cpu_supports_avx512(void) {
+        __builtin_cpu_init();
+        return __builtin_cpu_supports("avx512f");
+    }
+    #elif defined(_MSC_VER) && (defined(_M_X64) || defined(_M_IX86))
+    #include <intrin.h>
+    static int sklearn_extra_os_saves_registers(unsigned long long mask) {
+        int info[4];
+        __cpuid(info, 1);
+        /* OSXSAVE: the OS supports xgetbv */
+        if (!(info[2] & (1 << 27))) return 0;
+        return (_xgetbv(0) & mask) == mask;
+    }
+    static int sklearn_extra_cpu_supports_avx2(void) {
+        int info[4];
+        __cpuid(info, 0);
+        if (info[0] < 7) return 0;
+        /* /arch:AVX2 also emits FMA instructions, CPUID.1:ECX bit 12 */
+        __cpuid(info, 1);
+        if (!((info[2] >> 12) & 1)) return 0;
+        __cpuidex(info, 7, 0);
+        return ((info[1] >> 5) & 1) && sklearn_extra_os_saves_registers(0x6);
+    }
+    static int sklearn_extra_cpu_supports_avx512(void) {
+        int info[4];
+        __cpuid(info, 0);
+        if (info[0] < 7) return 0;
+        __cpuidex(info, 7, 0);
+        return ((info[1] >> 16) & 1) && sklearn_extra_os_saves_registers(0xe6);
+    }
+    #else
+    static int sklearn_extra_cpu_supports_avx2(void) { return 0; }
+    static int sklearn_extra_cpu_supports_avx512(void) { return 0; }
+    #endif
+    """
+    int sklearn_extra_cpu_supports_avx2()
+    int sklearn_extra_cpu_supports_avx512()
+
+
+def cpu_supports(isa):
+    """ Test if the CPU supports the instruction set 'avx2' or 'avx512'. """
+    if isa == 'avx2':
+        return bool(sklearn_extra_cpu_supports_avx2())
+    elif isa == 'avx512':
+        return bool(sklearn_extra_cpu_supports_avx512())
+    raise ValueError('Unknown instruction set %r' % isa)
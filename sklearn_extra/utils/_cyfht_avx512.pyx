@@ -0,0 +1,11 @@
+# cython: language_level=3
+
+""" Fast Hadamard Transform kernels compiled for AVX-512, see _cyfht.pyx. """
+
+
+import numpy as np
+cimport numpy as np
+cimport cython
+from libc.math cimport log2
+
+include "_fht_kernels.pxi"
@@ -0,0 +1,57 @@
+# License: BSD 3 clause
+
+import numpy as np
+
+from ._cyfht import is_power_of_two
+from ._fht_dispatch import fht2_columns
+
+
+def fht(array, axis=-1, normalize=False):
+    """Fast Hadamard transformation of an array along an axis, in-place.
+
+    Unlike the functions of the compiled module, any memory layout is
+    supported: Fortran ordered arrays, slices, transposed views and arrays
+    of any number of dimensions are transformed where they are, without
+    making a contiguous copy first.  The transformation along an axis which
+    is not the contiguous one is processed in blocks of neighbouring
+    transformations, so that memory is still accessed contiguously.
+
+    Parameters
+    ----------
+    array : ndarray of float32 or float64
+        Array to transform in-place.
+
+    axis : int, default: -1
+        Axis along which to transform.  Its length must be a power of two.
+
+    normalize : boolean, default: False
+        If True, the result is scaled by 1/sqrt(length of axis), which makes
+        the transformation orthonormal.
+
+    Returns
+    -------
+    array : ndarray
+        The transformed input array.
+    """
+    if (not isinstance(array, np.ndarray) or
+            array.dtype not in (np.float32, np.float64)):
+        raise TypeError('fht transforms float32 or float64 arrays in-place, '
+                        'got %r' % type(array))
+    if not array.flags.writeable:
+        raise ValueError('fht transforms arrays in-place, but array is '
+                         'read-only')
+    length = array.shape[axis]
+    if not is_power_of_two(length):
+        raise ValueError('Length of axis for fht must be a power of two')
+
+    columns = np.moveaxis(array, axis, 0)
+    if columns.ndim == 1:
+        columns = columns[:, np.newaxis]
+    # every slice along the dimensions between the first and the last one is
+    # a two dimensional view transformed column-wise
+    for index in np.ndindex(*columns.shape[1:-1]):
+        fht2_columns(columns[(slice(None),) + index])
+
+    if normalize:
+        array *= 1 / np.sqrt(length)
+    return array
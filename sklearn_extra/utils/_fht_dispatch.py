@@ -0,0 +1,88 @@
+"""Selection of the compiled FHT kernels for the instruction sets of the CPU.
+
+The kernels of _cyfht are also compiled for AVX2 and AVX-512 into sibling
+modules.  At import time, the fastest variant that was built and that the
+CPU supports is selected.  The environment variable SKLEARN_EXTRA_FHT_ISA
+forces a variant, e.g. to test all of them on the same machine.
+"""
+# License: BSD 3 clause
+
+import importlib
+import os
+
+from . import _cyfht
+
+
+ENVIRONMENT_VARIABLE = 'SKLEARN_EXTRA_FHT_ISA'
+
+# instruction sets and their modules, fastest first; 'sse2' is the baseline
+# build with the default compiler flags
+_MODULES = [
+    ('avx512', 'sklearn_extra.utils._cyfht_avx512'),
+    ('avx2', 'sklearn_extra.utils._cyfht_avx2'),
+    ('sse2', 'sklearn_extra.utils._cyfht'),
+]
+
+
+def _load(isa, module_name):
+    if isa != 'sse2' and not _cyfht.cpu_supports(isa):
+        return None
+    try:
+        return importlib.import_module(module_name)
+    except ImportError:
+        # not built, e.g. on other architectures than x86
+        return None
+
+
+def available_isas():
+    """Instruction sets with a built variant supported by the CPU.
+
+    Returns
+    -------
+    isas : list of str
+        Names of the usable variants, fastest first.
+    """
+    return [isa for isa, module_name in _MODULES
+            if _load(isa, module_name) is not None]
+
+
+def get_module(isa):
+    """Compiled FHT module for an instruction set.
+
+    Parameters
+    ----------
+    isa : {'avx512', 'avx2', 'sse2'}
+        Name of the instruction set.
+
+    Returns
+    -------
+    module : module
+        The module, which has the same functions as _cyfht.
+    """
+    modules = dict(_MODULES)
+    if isa not in modules:
+        raise ValueError('Unknown instruction set %r, expected one of %s'
+                         % (isa, sorted(modules)))
+    module = _load(isa, modules[isa])
+    if module is None:
+        raise ValueError('The FHT kernels for %r are not available, either '
+                         'they were not built or the CPU does not support '
+                         'them' % isa)
+    return module
+
+
+def _select():
+    forced = os.environ.get(ENVIRONMENT_VARIABLE)
+    if forced:
+        return forced, get_module(forced)
+    isa = available_isas()[0]
+    return isa, get_module(isa)
+
+
+ISA, _module = _select()
+
+fht = _module.fht
+fht2 = _module.fht2
+fht2_interleaved = _module.fht2_interleaved
+fht2_columns = _module.fht2_columns
+fht2_pruned = _module.fht2_pruned
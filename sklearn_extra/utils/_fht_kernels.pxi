@@ -0,0 +1,229 @@
+# Compiled kernels of the Fast Hadamard Transform.
+#
+# This file is included by _cyfht.pyx and by its variants compiled for
+# specific instruction sets, see _fht_dispatch.py.  The Python wrappers
+# release the GIL while transforming, so that threads transform in parallel.
+
+
+def is_power_of_two(input_integer):
+    """ Test if an integer is a power of two. """
+    if input_integer == 1:
+        return False
+    return input_integer != 0 and ((input_integer & (input_integer - 1)) == 0)
+
+
+def fht(cython.floating[::1] array_):
+    """ Single dimensional FHT. """
+    if not is_power_of_two(array_.shape[0]):
+        raise ValueError('Length of input for fht must be a power of two')
+    else:
+        with nogil:
+            _fht(array_)
+
+
+@cython.boundscheck(False)
+cdef void _fht(cython.floating[::1] array_) noexcept nogil:
+    cdef unsigned int bit, length, _, i, j
+    cdef cython.floating temp
+    bit = length = array_.shape[0]
+    for _ in xrange(<unsigned int>(log2(length))):
+        bit >>= 1
+        for i in xrange(length):
+            if i & bit == 0:
+                j = i | bit
+                temp = array_[i]
+                array_[i] += array_[j]
+                array_[j] = temp - array_[j]
+
+def fht2(cython.floating[:, ::1] array_):
+    """ Two dimensional row-wise FHT. """
+    if not is_power_of_two(array_.shape[1]):
+        raise ValueError('Length of rows for fht2 must be a power of two')
+    else:
+        with nogil:
+            _fht2(array_)
+
+
+@cython.boundscheck(False)
+cdef void _fht2(cython.floating[:, ::1] array_) noexcept nogil:
+    cdef unsigned int n
+    n = array_.shape[0]
+    for x in xrange(n):
+        # TODO: This call still shows up as yellow in cython -a presumably due
+        # to the [] access, but the array_ is already typed...
+        _fht(array_[x])
+
+
+def fht2_interleaved(cython.floating[:, ::1] array_,
+                     Py_ssize_t block_size=16):
+    """ Two dimensional row-wise FHT vectorised across rows.
+
+    Transforms block_size rows at a time after interleaving them, so that
+    each butterfly updates block_size contiguous values, one per row.  This
+    keeps the inner loop long and vectorisable even for short rows.
+    """
+    if not is_power_of_two(array_.shape[1]):
+        raise ValueError('Length of rows for fht2 must be a power of two')
+    if block_size < 1:
+        raise ValueError('block_size must be positive')
+    cdef cython.floating[::1] buffer_
+    if cython.floating is double:
+        buffer_ = np.empty(array_.shape[1] * block_size, dtype=np.float64)
+    else:
+        buffer_ = np.empty(array_.shape[1] * block_size, dtype=np.float32)
+    with nogil:
+        _fht2_interleaved(array_, buffer_, block_size)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void _fht2_interleaved(cython.floating[:, ::1] array_,
+                            cython.floating[::1] buffer_,
+                            Py_ssize_t block_size) noexcept nogil:
+    cdef Py_ssize_t n_rows, length, start, lanes, bit, i0, i, k
+    cdef cython.floating temp
+    cdef cython.floating *lo
+    cdef cython.floating *hi
+    n_rows = array_.shape[0]
+    length = array_.shape[1]
+    start = 0
+    while start < n_rows:
+        lanes = min(block_size, n_rows - start)
+        # value i of row start + k is stored at buffer_[i * lanes + k]
+        for k in range(lanes):
+            for i in range(length):
+                buffer_[i * lanes + k] = array_[start + k, i]
+        bit = length
+        while bit > 1:
+            bit >>= 1
+            i0 = 0
+            while i0 < length:
+                for i in range(i0, i0 + bit):
+                    lo = &buffer_[i * lanes]
+                    hi = &buffer_[(i + bit) * lanes]
+                    for k in range(lanes):
+                        temp = lo[k]
+                        lo[k] = temp + hi[k]
+                        hi[k] = temp - hi[k]
+                i0 += 2 * bit
+        for k in range(lanes):
+            for i in range(length):
+                array_[start + k, i] = buffer_[i * lanes + k]
+        start += block_size
+
+
+def fht2_columns(cython.floating[:, :] array_, Py_ssize_t block_size=64):
+    """ Two dimensional column-wise FHT of an arbitrarily strided array.
+
+    If the columns are contiguous, each column is transformed on its own.
+    Otherwise the butterflies are applied to blocks of block_size columns at
+    once, moving along the rows, which is the contiguous direction.
+    """
+    if not is_power_of_two(array_.shape[0]):
+        raise ValueError('Length of columns for fht2_columns must be a '
+                         'power of two')
+    if block_size < 1:
+        raise ValueError('block_size must be positive')
+    if abs(array_.strides[0]) < abs(array_.strides[1]):
+        with nogil:
+            _fht2_columns_each(array_)
+    else:
+        with nogil:
+            _fht2_columns_blocked(array_, block_size)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void _fht2_columns_each(cython.floating[:, :] array_) noexcept nogil:
+    cdef Py_ssize_t length, n_columns, bit, i0, i, k
+    cdef cython.floating temp
+    length = array_.shape[0]
+    n_columns = array_.shape[1]
+    for k in range(n_columns):
+        bit = length
+        while bit > 1:
+            bit >>= 1
+            i0 = 0
+            while i0 < length:
+                for i in range(i0, i0 + bit):
+                    temp = array_[i, k]
+                    array_[i, k] = temp + array_[i + bit, k]
+                    array_[i + bit, k] = temp - array_[i + bit, k]
+                i0 += 2 * bit
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void _fht2_columns_blocked(cython.floating[:, :] array_,
+                                Py_ssize_t block_size) noexcept nogil:
+    cdef Py_ssize_t length, n_columns, start, stop, bit, i0, i, k
+    cdef cython.floating temp
+    length = array_.shape[0]
+    n_columns = array_.shape[1]
+    start = 0
+    while start < n_columns:
+        stop = min(start + block_size, n_columns)
+        bit = length
+        while bit > 1:
+            bit >>= 1
+            i0 = 0
+            while i0 < length:
+                for i in range(i0, i0 + bit):
+                    for k in range(start, stop):
+                        temp = array_[i, k]
+                        array_[i, k] = temp + array_[i + bit, k]
+                        array_[i + bit, k] = temp - array_[i + bit, k]
+                i0 += 2 * bit
+        start += block_size
+
+
+def fht2_pruned(cython.floating[:, ::1] array_, Py_ssize_t n_nonzero):
+    """ Two dimensional row-wise FHT of rows with a nonzero prefix.
+
+    The values of each row from n_nonzero on are taken as zeros, whatever
+    they are, so that the caller does not need to write them.  The
+    butterflies of the stages of short strides are skipped where both
+    inputs are zero.  With m the next power of two from n_nonzero, the
+    transform of the row is the transform of its first m values repeated,
+    because H_length equals the Kronecker product of H_(length / m) and H_m,
+    so that the stages of strides of m and more reduce to copies.
+    """
+    if not is_power_of_two(array_.shape[1]):
+        raise ValueError('Length of rows for fht2 must be a power of two')
+    if not 0 <= n_nonzero <= array_.shape[1]:
+        raise ValueError('n_nonzero must be between 0 and the length of the '
+                         'rows')
+    with nogil:
+        _fht2_pruned(array_, n_nonzero)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void _fht2_pruned(cython.floating[:, ::1] array_,
+                       Py_ssize_t n_nonzero) noexcept nogil:
+    cdef Py_ssize_t n_rows, length, prefix, support, bit, i0, i, r
+    cdef cython.floating temp
+    n_rows = array_.shape[0]
+    length = array_.shape[1]
+    prefix = 1
+    while prefix < n_nonzero:
+        prefix <<= 1
+    for r in range(n_rows):
+        for i in range(n_nonzero, prefix):
+            array_[r, i] = 0
+        # the stages commute, the short strides are applied first so that
+        # the nonzero values only spread to the next multiple of 2 * bit
+        support = n_nonzero
+        bit = 1
+        while bit < prefix:
+            i0 = 0
+            while i0 < support:
+                for i in range(i0, i0 + bit):
+                    temp = array_[r, i]
+                    array_[r, i] = temp + array_[r, i + bit]
+                    array_[r, i + bit] = temp - array_[r, i + bit]
+                i0 += 2 * bit
+            support = i0
+            bit <<= 1
+        for i in range(prefix, length):
+            array_[r, i] = array_[r, i - prefix]
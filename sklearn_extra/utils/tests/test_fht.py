@@ -1,11 +1,21 @@
+import os
+import subprocess
+import sys
+
+import pytest
 import numpy as np
 import numpy.testing as npt
 from scipy.linalg import hadamard
 
 from sklearn.utils.testing import assert_raises
 
+from sklearn_extra.utils import fht
 from sklearn_extra.utils._cyfht import fht as cyfht
 from sklearn_extra.utils._cyfht import fht2 as cyfht2
+from sklearn_extra.utils._cyfht import fht2_interleaved as cyfht2_interleaved
+from sklearn_extra.utils._cyfht import fht2_pruned as cyfht2_pruned
+from sklearn_extra.utils._cyfht import pure_python_fht
+from sklearn_extra.utils import _fht_dispatch
 
 
 def test_wikipedia_example():
@@ -35,6 +45,123 @@ def test_numerical_fuzzing_fht2():
             npt.assert_array_almost_equal(np.dot(copy, H), input_)
 
 
+def test_numerical_fuzzing_fht2_interleaved():
+    for length in [2, 4, 8, 16, 32, 64]:
+        for rows in [1, 2, 3, 4, 5, 17, 40]:
+            for block_size in [1, 3, 16]:
+                input_ = np.random.normal(size=(rows, length))
+                copy = input_.copy()
+                H = hadamard(length)
+                cyfht2_interleaved(input_, block_size)
+                npt.assert_array_almost_equal(np.dot(copy, H), input_)
+
+
+def test_fht2_interleaved_float32():
+    input_ = np.random.normal(size=(40, 32))
+    expected = np.dot(input_, hadamard(32))
+    input_ = input_.astype(np.float32)
+    cyfht2_interleaved(input_)
+    npt.assert_array_almost_equal(expected, input_, decimal=4)
+
+
+@pytest.mark.parametrize('dtype', [np.float32, np.float64])
+def test_fht2_pruned(dtype):
+    length = 64
+    for n_nonzero in [0, 1, 3, 16, 17, 40, 63, 64]:
+        input_ = np.random.normal(size=(7, length)).astype(dtype)
+        input_[:, n_nonzero:] = 0
+        expected = np.dot(input_, hadamard(length))
+        # the values from n_nonzero on are neither read nor required to be 0
+        input_[:, n_nonzero:] = np.nan
+        cyfht2_pruned(input_, n_nonzero)
+        npt.assert_allclose(expected, input_, rtol=1e-4, atol=1e-4)
+    assert_raises(ValueError, cyfht2_pruned, np.zeros((2, 8)), 9)
+    assert_raises(ValueError, cyfht2_pruned, np.zeros((2, 6)), 3)
+
+
 def test_exception_when_input_not_power_two():
     assert_raises(ValueError, cyfht, np.zeros(9, dtype=np.float64))
     assert_raises(ValueError, cyfht2, np.zeros((2, 9), dtype=np.float64))
+    assert_raises(ValueError, cyfht2_interleaved,
+                  np.zeros((2, 9), dtype=np.float64))
+
+
+@pytest.mark.parametrize('order', ['C', 'F'])
+@pytest.mark.parametrize('axis', [0, 1, -1])
+def test_fht_axis(order, axis):
+    input_ = np.asarray(np.random.normal(size=(16, 32)), order=order)
+    expected = np.moveaxis(
+        np.dot(np.moveaxis(input_, axis, -1),
+               hadamard(input_.shape[axis])), -1, axis)
+    output = fht(input_, axis=axis)
+    assert output is input_
+    npt.assert_array_almost_equal(expected, input_)
+
+
+def test_fht_strided_views():
+    input_ = np.random.normal(size=(6, 64, 3, 8))
+    expected = np.einsum('ijkl,jm->imkl', input_, hadamard(64))
+    fht(input_, axis=1)
+    npt.assert_array_almost_equal(expected, input_)
+
+    input_ = np.random.normal(size=(20, 64))
+    expected = input_.copy()
+    expected[::2, ::4] = np.dot(expected[::2, ::4], hadamard(16))
+    fht(input_.T[::4, ::2], axis=0)
+    npt.assert_array_almost_equal(expected, input_)
+
+
+def test_fht_normalize():
+    input_ = np.random.normal(size=(5, 32)).astype(np.float32)
+    norms = np.linalg.norm(input_, axis=1)
+    fht(input_, normalize=True)
+    npt.assert_array_almost_equal(norms, np.linalg.norm(input_, axis=1),
+                                  decimal=5)
+
+
+def test_fht_invalid_input():
+    assert_raises(ValueError, fht, np.zeros((4, 9)))
+    assert_raises(TypeError, fht, np.zeros(8, dtype=np.int64))
+    assert_raises(TypeError, fht, [0.] * 8)
+    read_only = np.zeros(8)
+    read_only.flags.writeable = False
+    assert_raises(ValueError, fht, read_only)
+
+
+@pytest.mark.parametrize('isa', _fht_dispatch.available_isas())
+@pytest.mark.parametrize('dtype', [np.float32, np.float64])
+def test_isa_variants_match_pure_python_fht(isa, dtype):
+    module = _fht_dispatch.get_module(isa)
+    for length in [2, 4, 8, 16, 32, 64, 256]:
+        input_ = np.random.normal(size=(19, length)).astype(dtype)
+        expected = input_.astype(np.float64)
+        for row in expected:
+            pure_python_fht(row)
+        decimal = 3 if dtype == np.float32 else 6
+
+        output = input_.copy()
+        for row in output:
+            module.fht(row)
+        npt.assert_array_almost_equal(expected, output, decimal=decimal)
+        for transform in [module.fht2, module.fht2_interleaved,
+                          lambda array_: module.fht2_pruned(array_, length)]:
+            output = input_.copy()
+            transform(output)
+            npt.assert_array_almost_equal(expected, output, decimal=decimal)
+        output = np.asfortranarray(input_)
+        module.fht2_columns(output.T)
+        npt.assert_array_almost_equal(expected, output, decimal=decimal)
+
+
+def test_isa_environment_variable():
+    code = ('from sklearn_extra.utils import _fht_dispatch; '
+            'print(_fht_dispatch.ISA)')
+    for isa in _fht_dispatch.available_isas():
+        env = dict(os.environ, **{_fht_dispatch.ENVIRONMENT_VARIABLE: isa})
+        output = subprocess.check_output([sys.executable, '-c', code],
+                                         env=env)
+        assert output.decode().strip() == isa
+
+
+def test_isa_unknown():
+    assert_raises(ValueError, _fht_dispatch.get_module, 'mmx')